@@ -0,0 +1,106 @@
+import logging
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from columns import ColumnSchema, iso_timestamp
+
+logger = logging.getLogger('LSPScraper.appointments')
+
+# A grid holds my scheduled work if its header has one of these columns
+SCHEDULE_MARKER_COLUMNS = ("interpretationDate",)
+
+# Reads every row of the schedule grid(s) in one round-trip. textContent is
+# used instead of innerText because the dashboard is hidden once the Open
+# Jobs tab is selected. ag-grid splits a row across pinned and centre
+# containers, so cells are merged by row-id.
+ASSIGNED_ROWS_SCRIPT = r"""
+const markers = arguments[0];
+const rows = {};
+for (const grid of document.querySelectorAll('ag-grid-angular')) {
+    const header = Array.from(grid.querySelectorAll('.ag-header-cell[col-id]'), h => h.getAttribute('col-id'));
+    if (!header.some(colId => markers.includes(colId))) continue;
+    for (const row of grid.querySelectorAll('.ag-row')) {
+        const rowId = row.getAttribute('row-id');
+        if (!rowId) continue;
+        const record = rows[rowId] || (rows[rowId] = {});
+        for (const cell of row.querySelectorAll('[col-id]')) {
+            const text = cell.textContent.trim();
+            if (text) record[cell.getAttribute('col-id')] = text;
+        }
+    }
+}
+return Object.values(rows);
+"""
+
+
+def job_interval(job: Dict, default_minutes: int) -> Optional[Tuple[float, float]]:
+    """(start, end) timestamps of a job, or None when its time is unknown."""
+    start = iso_timestamp(job.get("appointment_at"))
+    if start is None:
+        return None
+    minutes = job.get("duration_minutes") or default_minutes
+    return start, start + minutes * 60
+
+
+class ScheduleIndex:
+    """Sorted, merged intervals of my assigned appointments.
+
+    Each appointment is widened by the travel buffer on both sides and
+    overlapping intervals are merged, so the intervals are disjoint and sorted
+    by both start and end. A conflict check is then one binary search.
+    """
+
+    def __init__(self, appointments: List[Dict], travel_buffer_minutes: int = 0,
+                 default_minutes: int = 60):
+        self.default_minutes = default_minutes
+        self.appointment_count = 0
+        buffer = travel_buffer_minutes * 60
+
+        intervals = []
+        for appointment in appointments:
+            interval = job_interval(appointment, default_minutes)
+            if interval is None:
+                continue
+            self.appointment_count += 1
+            label = f"{appointment.get('id', '?')} {appointment.get('appointment_time', '')}".strip()
+            intervals.append((interval[0] - buffer, interval[1] + buffer, label))
+        intervals.sort()
+
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self.labels: List[List[str]] = []
+        for start, end, label in intervals:
+            if self.ends and start < self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+                self.labels[-1].append(label)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+                self.labels.append([label])
+
+    def __len__(self):
+        return self.appointment_count
+
+    def conflicts(self, job: Dict) -> List[str]:
+        """Labels of the assigned appointments the job overlaps (travel included)."""
+        interval = job_interval(job, self.default_minutes)
+        if interval is None or not self.starts:
+            return []
+        start, end = interval
+        # Last merged interval starting before the job ends is the only candidate
+        idx = bisect_left(self.starts, end) - 1
+        if idx >= 0 and self.ends[idx] > start:
+            return self.labels[idx]
+        return []
+
+
+def read_assigned_appointments(driver, columns: ColumnSchema) -> List[Dict]:
+    """Read my scheduled appointments from the portal's dashboard grid."""
+    records = driver.execute_script(ASSIGNED_ROWS_SCRIPT, list(SCHEDULE_MARKER_COLUMNS)) or []
+    appointments = []
+    for record in records:
+        appointment = {"id": "", "appointment_time": "", "columns": {}}
+        for col_id, text in record.items():
+            ColumnSchema.apply(columns.rule(col_id), text, appointment)
+        appointments.append(appointment)
+    return appointments
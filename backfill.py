@@ -0,0 +1,240 @@
+"""Rebuild job history from existing scraper logs.
+
+Usage:
+    python backfill.py [log files ...] [--db PATH] [--dry-run]
+
+Without arguments the current LOG_FILE and its rotated backups (LOG_FILE.1,
+LOG_FILE.2, ..., optionally gzip-compressed) are read, oldest first. Every
+poll logged its rows ("Processing row: ..." followed by one "Cell N col-id:
+..., text: ..." line per cell) and ended with "Found N new jobs" or "No new
+jobs found". Those lines are enough to reconstruct each poll's open jobs and
+how long the check took.
+
+The logs are streamed line by line and only the poll being parsed is held in
+memory, so file size does not matter. Polls at or before the newest one already
+in the archive are skipped, so running it twice adds nothing.
+"""
+import argparse
+import glob
+import gzip
+import logging
+import os
+import re
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from columns import ColumnSchema
+from config import LOG_FILE, HISTORY_DB
+from extraction import JobExtractor
+from history import JobHistory
+
+CELL_LINE = re.compile(r"Cell (\d+) col-id: (.*?), text: (.*)", re.DOTALL)
+FOUND_LINE = re.compile(r"Found (\d+) new jobs$")
+GRIDS_LINE = re.compile(r"Found \d+ grid elements$")
+
+CYCLE_START = "Checking for new jobs..."
+NO_NEW_JOBS = "No new jobs found"
+GRID_UNCHANGED = "Job grid unchanged since last cycle"
+# The rows of these polls came from some other grid than Open Jobs
+OPEN_JOBS_MISSING = ("Could not find 'Open Jobs' tab", "Open Jobs grid not visible")
+ROW_PREFIX = "Processing row: "
+
+
+class LogCycle(NamedTuple):
+    started_at: float
+    observed_at: float
+    jobs: Optional[List[Dict]]  # None when the grid was unchanged
+    new_count: int
+
+
+def _timestamp(stamp: str) -> float:
+    """POSIX time of a logging asctime ("2025-05-12 14:07:06,441", local time)."""
+    return time.mktime((
+        int(stamp[0:4]), int(stamp[5:7]), int(stamp[8:10]),
+        int(stamp[11:13]), int(stamp[14:16]), int(stamp[17:19]), 0, 0, -1
+    )) + int(stamp[20:23]) / 1000
+
+
+def _records(lines: Iterable[str]) -> Iterator[tuple]:
+    """Join continuation lines onto their record and yield (asctime, message)."""
+    stamp = None
+    message = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        # "2025-05-12 14:07:06,441 - LSPScraper - INFO - message"
+        if len(line) > 26 and line[4] == "-" and line[10] == " " and line[23:26] == " - ":
+            if stamp is not None:
+                yield stamp, "\n".join(message)
+            parts = line.split(" - ", 3)
+            stamp = parts[0]
+            message = [parts[3] if len(parts) == 4 else ""]
+        elif stamp is not None:
+            message.append(line)
+    if stamp is not None:
+        yield stamp, "\n".join(message)
+
+
+def parse_log_cycles(lines: Iterable[str], columns: ColumnSchema) -> Iterator[LogCycle]:
+    """Yield one LogCycle per completed poll found in the log lines.
+
+    Polls without a grid, polls where the Open Jobs tab could not be opened,
+    and polls that failed before reporting their new jobs, say nothing about
+    which jobs were open and are skipped.
+    """
+    started_at = None
+    saw_grid = False
+    unchanged = False
+    open_jobs_missing = False
+    jobs: Dict[str, Dict] = {}
+    job = None
+    row_id = ""
+
+    for stamp, message in _records(lines):
+        if message.startswith("Cell "):
+            match = CELL_LINE.match(message)
+            if match and job is not None:
+                # Cells without a col-id were logged as "None" and mapped by position
+                col_id = None if match.group(2) == "None" else match.group(2)
+                JobExtractor.apply_cell(job, int(match.group(1)), columns.rule(col_id), match.group(3).strip())
+            continue
+
+        if job is not None:
+            # The row's cells are done; build the record exactly as the live extractor does,
+            # and rows repeated in other grids keep their first copy
+            job = JobExtractor.finish_job(job, row_id)
+            if job.get("id"):
+                jobs.setdefault(str(job["id"]), job)
+            job = None
+
+        if message.startswith(ROW_PREFIX):
+            row_text = message[len(ROW_PREFIX):]
+            first_line = row_text.split("\n", 1)[0].strip()
+            row_id = first_line if first_line.isdigit() else ""
+            job = JobExtractor.new_job(row_id)
+        elif message == CYCLE_START:
+            started_at = _timestamp(stamp)
+            saw_grid = unchanged = open_jobs_missing = False
+            jobs = {}
+        elif started_at is None:
+            continue
+        elif GRIDS_LINE.match(message):
+            saw_grid = True
+        elif message.startswith(GRID_UNCHANGED):
+            unchanged = True
+        elif message.startswith(OPEN_JOBS_MISSING):
+            open_jobs_missing = True
+        elif message == NO_NEW_JOBS or FOUND_LINE.match(message):
+            if saw_grid and not open_jobs_missing:
+                match = FOUND_LINE.match(message)
+                yield LogCycle(
+                    started_at,
+                    _timestamp(stamp),
+                    None if unchanged else list(jobs.values()),
+                    int(match.group(1)) if match else 0,
+                )
+            started_at = None
+            jobs = {}
+
+
+def rotated_logs(log_file: str = LOG_FILE) -> List[str]:
+    """The log and its RotatingFileHandler backups, oldest first."""
+    backups = []
+    for path in glob.glob(f"{glob.escape(log_file)}.*"):
+        suffix = path[len(log_file) + 1:]
+        if suffix.endswith(".gz"):
+            suffix = suffix[:-3]
+        if suffix.isdigit():
+            backups.append((int(suffix), path))
+    paths = [path for _, path in sorted(backups, reverse=True)]
+    if os.path.exists(log_file):
+        paths.append(log_file)
+    return paths
+
+
+def _open_log(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def backfill(paths: List[str], history: Optional[JobHistory], columns: ColumnSchema) -> Dict:
+    """Feed every poll found in the logs into the archive and return run statistics."""
+    after = history.last_observed() if history else None
+    stats = {"files": 0, "bytes": 0, "cycles": 0, "skipped": 0, "observed": 0,
+             "check_seconds": 0.0, "max_check_seconds": 0.0}
+    previous = None
+    pending_touch = None
+
+    for path in paths:
+        stats["files"] += 1
+        stats["bytes"] += os.path.getsize(path)
+        with _open_log(path) as lines:
+            for cycle in parse_log_cycles(lines, columns):
+                stats["cycles"] += 1
+                check_seconds = cycle.observed_at - cycle.started_at
+                stats["check_seconds"] += check_seconds
+                stats["max_check_seconds"] = max(stats["max_check_seconds"], check_seconds)
+                if after is not None and cycle.observed_at <= after:
+                    stats["skipped"] += 1
+                    continue
+                if history is None:
+                    continue
+
+                # Like the live scraper, an unchanged job list only moves last_seen
+                # forward, and only the latest such poll matters
+                if cycle.jobs is None or cycle.jobs == previous:
+                    pending_touch = cycle.observed_at
+                    continue
+                with history.batch():
+                    if pending_touch:
+                        history.touch(pending_touch)
+                        pending_touch = None
+                    history.observe(
+                        cycle.jobs,
+                        observed_at=cycle.observed_at,
+                        new_count=cycle.new_count,
+                        check_seconds=check_seconds,
+                    )
+                previous = cycle.jobs
+                stats["observed"] += 1
+
+    if history is not None and pending_touch:
+        history.touch(pending_touch)
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the job history archive from scraper logs")
+    parser.add_argument("paths", nargs="*", help="log files, oldest first (default: LOG_FILE and its backups)")
+    parser.add_argument("--db", default=HISTORY_DB, help="archive path (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="parse and report without writing the archive")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    paths = args.paths or rotated_logs()
+    if not paths:
+        print("No log files found")
+        return 1
+
+    history = None if args.dry_run else JobHistory(args.db)
+    started = time.perf_counter()
+    try:
+        stats = backfill(paths, history, ColumnSchema())
+    finally:
+        if history:
+            history.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"Read {stats['files']} files, {stats['bytes'] / 1e6:.1f} MB in {elapsed:.2f}s "
+          f"({stats['bytes'] / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+    print(f"Found {stats['cycles']} polls, {stats['skipped']} already archived, "
+          f"{stats['observed']} with a changed job list written")
+    if stats["cycles"]:
+        print(f"Check time: mean {stats['check_seconds'] / stats['cycles']:.1f}s, "
+              f"max {stats['max_check_seconds']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Benchmark process startup and module import time against a budget.
+
+Usage:
+    python bench_startup.py [--runs N] [--budget-ms MS]
+
+Every entry module is imported in a fresh interpreter with ``-X importtime``.
+The run fails if one of them pulls in a heavy dependency at import time or
+its cumulative import time goes over the budget. Keep short-lived commands
+(--once, --test-notification, restarts after a crash) near-instant.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ENTRY_MODULES = ("main", "scraper", "notifications", "extraction", "replay")
+
+# Must only be imported when first used
+HEAVY_MODULES = ("selenium", "webdriver_manager", "telegram", "requests", "aiohttp", "psutil")
+
+# replay.py needs BeautifulSoup by design; everything else must stay light
+ALLOWED_HEAVY = {"replay": ("bs4",)}
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(module: str):
+    """Import module in a fresh interpreter; return (wall s, import us, heavy modules loaded)."""
+    code = (
+        f"import sys, {module}\n"
+        f"print(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    )
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - start
+
+    import_us = 0
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            import_us = int(parts[1].strip())
+
+    loaded = set(result.stdout.split())
+    heavy = sorted(m for m in HEAVY_MODULES + ("bs4",)
+                   if m in loaded and m not in ALLOWED_HEAVY.get(module, ()))
+    return wall, import_us, heavy
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure startup/import time of the notifier")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="maximum cumulative import time per module (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    print(f"{'module':<15} {'wall ms':>10} {'import ms':>10}  heavy imports")
+    for module in ENTRY_MODULES:
+        samples = [measure(module) for _ in range(args.runs)]
+        wall = min(sample[0] for sample in samples) * 1000
+        import_ms = min(sample[1] for sample in samples) / 1000
+        heavy = samples[-1][2]
+
+        over_budget = import_ms > args.budget_ms
+        if heavy or over_budget:
+            failures += 1
+        print(f"{module:<15} {wall:>10.1f} {import_ms:>10.1f}  "
+              f"{', '.join(heavy) or '-'}{'  OVER BUDGET' if over_budget else ''}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
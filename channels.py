@@ -0,0 +1,264 @@
+import asyncio
+import html
+import json
+import logging
+import re
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import config
+from deadlines import CircuitBreaker
+
+_TAG = re.compile(r"<[^>]+>")
+
+CHANNEL_TYPES = ("telegram", "email", "webhook", "file")
+
+# config.py settings the channels are built from; a reload passes new values
+CHANNEL_SETTINGS = (
+    "NOTIFY_CHANNELS",
+    "CHANNEL_TIMEOUT",
+    "CHANNEL_FAILURE_THRESHOLD",
+    "CHANNEL_BACKOFF",
+    "CHANNEL_MAX_BACKOFF",
+    "EMAIL_SMTP_SERVER",
+    "EMAIL_SMTP_PORT",
+    "EMAIL_USERNAME",
+    "EMAIL_PASSWORD",
+    "EMAIL_FROM",
+    "EMAIL_TO",
+    "EMAIL_STARTTLS",
+    "WEBHOOK_URLS",
+    "NOTIFY_FILE",
+)
+
+
+def channel_settings() -> Dict:
+    """The channel settings config.py was loaded with."""
+    return {key: getattr(config, key) for key in CHANNEL_SETTINGS}
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def plain_text(message: str) -> str:
+    """Telegram HTML message as plain text for email, webhooks and files."""
+    return html.unescape(_TAG.sub("", message))
+
+
+class Channel:
+    """One notification destination with its own timeout and circuit breaker.
+
+    While the breaker is open, send() fails immediately instead of waiting on
+    a destination that is known to be down.
+    """
+
+    # Whether a successful send counts as the job having been delivered
+    delivers = True
+
+    def __init__(self, name: str, settings: Dict):
+        self.logger = logging.getLogger(f'LSPScraper.channels.{name}')
+        self.name = name
+        self.timeout = settings["CHANNEL_TIMEOUT"]
+        self.breaker = CircuitBreaker(
+            f"channel:{name}",
+            failure_threshold=settings["CHANNEL_FAILURE_THRESHOLD"],
+            base_delay=settings["CHANNEL_BACKOFF"],
+            max_delay=settings["CHANNEL_MAX_BACKOFF"]
+        )
+
+    async def send(self, subject: str, message: str) -> bool:
+        if not self.breaker.allow():
+            self.logger.warning(
+                f"Skipping {self.name}: circuit open, retry in {self.breaker.retry_after():.0f}s"
+            )
+            return False
+        try:
+            sent = await asyncio.wait_for(self._send(subject, message), self.timeout or None)
+        except asyncio.TimeoutError:
+            self.logger.error(f"{self.name} did not answer within {self.timeout}s")
+            sent = False
+        except Exception as e:
+            self.logger.error(f"{self.name} failed: {type(e).__name__}: {str(e)}")
+            sent = False
+        if sent:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        return sent
+
+    async def _send(self, subject: str, message: str) -> bool:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class TelegramChannel(Channel):
+    """Telegram through the NotificationManager's bot and raw-API fallback."""
+
+    def __init__(self, manager, settings: Dict):
+        super().__init__("telegram", settings)
+        self.manager = manager
+
+    async def _send(self, subject: str, message: str) -> bool:
+        # The subject is plain text, like the email subject; the message is already HTML
+        formatted_message = (
+            f"<b>{html.escape(subject)}</b>\n\n{message}" if '<' in message else f"{subject}\n\n{message}"
+        )
+        return await self.manager.send_telegram(formatted_message)
+
+
+class EmailChannel(Channel):
+    """SMTP email over one kept-alive connection, reopened when the server drops it.
+
+    smtplib blocks, so it runs in a worker thread.
+    """
+
+    def __init__(self, settings: Dict):
+        super().__init__("email", settings)
+        self.server = settings["EMAIL_SMTP_SERVER"]
+        self.port = settings["EMAIL_SMTP_PORT"]
+        self.username = settings["EMAIL_USERNAME"]
+        self.password = settings["EMAIL_PASSWORD"]
+        self.starttls = settings["EMAIL_STARTTLS"]
+        self.sender = settings["EMAIL_FROM"]
+        self.recipients = _split(settings["EMAIL_TO"])
+        self._smtp = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        import smtplib
+        smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout or None)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    def _deliver(self, email) -> bool:
+        import smtplib
+        with self._lock:
+            for attempt in range(2):
+                if self._smtp is None:
+                    self._smtp = self._connect()
+                try:
+                    self._smtp.send_message(email)
+                    return True
+                except smtplib.SMTPServerDisconnected:
+                    # Idle connections get dropped by the server; reconnect once
+                    self._smtp = None
+                    if attempt:
+                        raise
+        return False
+
+    async def _send(self, subject: str, message: str) -> bool:
+        if not self.recipients:
+            self.logger.error("No EMAIL_TO recipients configured")
+            return False
+        from email.message import EmailMessage
+        email = EmailMessage()
+        email["Subject"] = subject
+        email["From"] = self.sender
+        email["To"] = ", ".join(self.recipients)
+        email.set_content(plain_text(message))
+        return await asyncio.to_thread(self._deliver, email)
+
+    def _quit(self):
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except Exception:
+                    pass
+                self._smtp = None
+
+    async def close(self):
+        await asyncio.to_thread(self._quit)
+
+
+class WebhookChannel(Channel):
+    """JSON POST to a generic webhook over a pooled aiohttp session."""
+
+    def __init__(self, url: str, settings: Dict, name: str = "webhook"):
+        super().__init__(name, settings)
+        self.url = url
+        self._session = None
+
+    async def _send(self, subject: str, message: str) -> bool:
+        import aiohttp
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout or None))
+        payload = {"subject": subject, "text": plain_text(message), "html": message}
+        async with self._session.post(self.url, json=payload) as response:
+            if response.status >= 300:
+                self.logger.error(f"{self.name} answered {response.status}: {(await response.text())[:200]}")
+                return False
+            return True
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class FileChannel(Channel):
+    """JSON lines appended to a file, or printed to stdout with "-".
+
+    A local record only, so it never counts as the job having been delivered.
+    """
+
+    delivers = False
+
+    def __init__(self, settings: Dict):
+        super().__init__("file", settings)
+        self.path = settings["NOTIFY_FILE"]
+
+    async def _send(self, subject: str, message: str) -> bool:
+        line = json.dumps({
+            "time": datetime.now().isoformat(),
+            "subject": subject,
+            "text": plain_text(message),
+        })
+        if self.path == "-":
+            print(line, file=sys.stdout, flush=True)
+        else:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        return True
+
+
+def build_channels(manager, settings: Optional[Dict] = None) -> List[Channel]:
+    """Instantiate the channels listed in NOTIFY_CHANNELS, skipping unknown ones.
+
+    Nothing connects here; connections are opened by the first send.
+    """
+    settings = settings if settings is not None else channel_settings()
+    channels = []
+    for name in [n.lower() for n in _split(settings["NOTIFY_CHANNELS"])]:
+        if name == "telegram":
+            channels.append(TelegramChannel(manager, settings))
+        elif name == "email":
+            channels.append(EmailChannel(settings))
+        elif name == "webhook":
+            urls = _split(settings["WEBHOOK_URLS"])
+            for idx, url in enumerate(urls):
+                channels.append(WebhookChannel(url, settings, f"webhook-{idx}" if len(urls) > 1 else "webhook"))
+            if not urls:
+                manager.logger.error("Webhook channel enabled but WEBHOOK_URLS is empty")
+        elif name == "file":
+            channels.append(FileChannel(settings))
+        else:
+            manager.logger.error(f"Unknown notification channel '{name}' in NOTIFY_CHANNELS")
+    return channels
+
+
+def channel_stats(channels: List[Channel]) -> Dict[str, Dict]:
+    """Breaker state of every channel, for the heartbeat file."""
+    return {channel.name: channel.breaker.snapshot() for channel in channels}
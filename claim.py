@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import quote
+
+from config import (
+    AUTO_CLAIM_MODE,
+    AUTO_CLAIM_RULES_FILE,
+    AUTO_CLAIM_URL,
+    AUTO_CLAIM_DRY_RUN_URL,
+    AUTO_CLAIM_PAYLOAD,
+    AUTO_CLAIM_TOKEN_KEY,
+    AUTO_CLAIM_TIMEOUT,
+    AUTO_CLAIM_MAX_PER_CYCLE
+)
+from filters import JobFilter
+
+logger = logging.getLogger('LSPScraper.claim')
+
+
+class ClaimResult(NamedTuple):
+    job: Dict
+    success: bool
+    status: Optional[int]
+    detail: str
+    request_ms: float
+    total_ms: Optional[float]  # From detection to the portal's answer
+
+
+class AutoClaimer:
+    """Accept open jobs that match strict accept rules as soon as they are seen.
+
+    Claims go out over HTTP, authenticated with the Selenium session's cookies
+    (plus a bearer token from localStorage when AUTO_CLAIM_TOKEN_KEY is set).
+    In dry-run mode the identical request goes to AUTO_CLAIM_DRY_RUN_URL
+    instead (see claim_standin.py) and no credentials are sent.
+    """
+
+    def __init__(self, mode: str = AUTO_CLAIM_MODE, rules: Optional[JobFilter] = None):
+        self.mode = mode
+        self.rules = rules if rules is not None else JobFilter.from_file(AUTO_CLAIM_RULES_FILE)
+        self.url = AUTO_CLAIM_DRY_RUN_URL if mode == "dry-run" else AUTO_CLAIM_URL
+        self.payload = AUTO_CLAIM_PAYLOAD
+
+        if self.mode not in ("off", "dry-run", "live"):
+            logger.error(f"Unknown AUTO_CLAIM_MODE '{self.mode}', auto-claim disabled")
+            self.mode = "off"
+        elif self.mode != "off" and not self.rules.include:
+            # Never accept everything just because the rules file is missing
+            logger.error(f"Auto-claim needs at least one include rule in {AUTO_CLAIM_RULES_FILE}, disabled")
+            self.mode = "off"
+        elif self.mode != "off" and not self.url:
+            logger.error("Auto-claim is enabled but AUTO_CLAIM_URL is not set, disabled")
+            self.mode = "off"
+        elif self.mode != "off" and "$job_id" in self.payload:
+            # The old template syntax would now be sent to the portal verbatim
+            logger.error("AUTO_CLAIM_PAYLOAD uses $job_id, write {job_id} instead; auto-claim disabled")
+            self.mode = "off"
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def select(self, jobs: List[Dict]) -> List[Dict]:
+        """Jobs that pass the accept rules, capped at AUTO_CLAIM_MAX_PER_CYCLE."""
+        return self.rules.apply(jobs)[:AUTO_CLAIM_MAX_PER_CYCLE]
+
+    def _credentials(self, driver) -> Dict:
+        """Cookies and headers of the browser's authenticated session."""
+        if self.mode == "dry-run" or driver is None:
+            return {"cookies": {}, "headers": {}}
+        cookies = {cookie["name"]: cookie["value"] for cookie in driver.get_cookies()}
+        headers = {}
+        if AUTO_CLAIM_TOKEN_KEY:
+            token = driver.execute_script("return window.localStorage.getItem(arguments[0]);", AUTO_CLAIM_TOKEN_KEY)
+            if token:
+                headers["Authorization"] = f"Bearer {token.strip(chr(34))}"
+        return {"cookies": cookies, "headers": headers}
+
+    async def claim(self, jobs: List[Dict], driver, session, detected_at: Optional[float]) -> List[ClaimResult]:
+        """Send accept requests for all jobs concurrently."""
+        credentials = self._credentials(driver)
+        return await asyncio.gather(*(
+            self._claim_one(job, session, credentials, detected_at) for job in jobs
+        ))
+
+    async def _claim_one(self, job: Dict, session, credentials: Dict, detected_at: Optional[float]) -> ClaimResult:
+        import aiohttp
+
+        job_id = str(job["id"])
+        url = self.url.replace("{job_id}", quote(job_id, safe=""))
+        # Substituted as a JSON string, so the body stays valid whatever the ID holds
+        body = self.payload.replace("{job_id}", json.dumps(job_id))
+        headers = {**credentials["headers"], "Content-Type": "application/json;charset=UTF-8"}
+
+        started = time.monotonic()
+        status = None
+        try:
+            async with session.post(
+                url,
+                data=body,
+                headers=headers,
+                cookies=credentials["cookies"],
+                timeout=aiohttp.ClientTimeout(total=AUTO_CLAIM_TIMEOUT)
+            ) as response:
+                status = response.status
+                detail = (await response.text())[:200]
+                success = 200 <= status < 300
+        except Exception as e:
+            success = False
+            detail = f"{type(e).__name__}: {str(e)}"
+        finished = time.monotonic()
+
+        result = ClaimResult(
+            job,
+            success,
+            status,
+            detail,
+            (finished - started) * 1000,
+            (finished - detected_at) * 1000 if detected_at else None,
+        )
+        logger.info(
+            f"Auto-claim ({self.mode}) of job {job_id}: {'accepted' if success else 'failed'} "
+            f"status={status} request={result.request_ms:.0f}ms "
+            f"detection-to-claim={result.total_ms or 0:.0f}ms"
+        )
+        return result
@@ -0,0 +1,54 @@
+"""Local stand-in for the portal's accept endpoint, for auto-claim dry runs.
+
+Usage:
+    python claim_standin.py [--port 8765] [--latency-ms 150] [--fail-rate 0.2]
+
+Run it, then start the notifier with AUTO_CLAIM_MODE=dry-run. Every claim
+request is printed with its headers and body, and answered after the given
+latency. A fraction of the requests fail, so the failure path and its
+notification can be exercised too.
+"""
+import argparse
+import asyncio
+import json
+import random
+from datetime import datetime
+
+from aiohttp import web
+
+
+def make_app(latency_ms: float, fail_rate: float) -> web.Application:
+    claimed = set()
+
+    async def claim(request: web.Request) -> web.Response:
+        job_id = request.match_info["job_id"]
+        body = await request.text()
+        print(f"{datetime.now().isoformat()} {request.method} {request.path} body={body}")
+
+        await asyncio.sleep(latency_ms / 1000)
+        if random.random() < fail_rate:
+            return web.json_response({"status": "error", "message": "Simulated failure"}, status=500)
+        if job_id in claimed:
+            return web.json_response({"status": "error", "message": "Already assigned"}, status=409)
+        claimed.add(job_id)
+        return web.json_response({"status": "accepted", "requestID": job_id})
+
+    app = web.Application()
+    app.router.add_route("*", "/claim/{job_id}", claim)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in accept endpoint for auto-claim dry runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=150, help="simulated server latency")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of claims that fail")
+    args = parser.parse_args()
+
+    print(json.dumps(vars(args)))
+    web.run_app(make_app(args.latency_ms, args.fail_rate), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from config import COLUMN_SCHEMA_FILE, PORTAL_TIMEZONE
+
+logger = logging.getLogger('LSPScraper.columns')
+
+# US zone abbreviations the portal appends to times ("05/16/2025 09:30 AM EDT")
+TIMEZONE_OFFSETS = {
+    "EST": -5, "EDT": -4,
+    "CST": -6, "CDT": -5,
+    "MST": -7, "MDT": -6,
+    "PST": -8, "PDT": -7,
+    "UTC": 0, "GMT": 0,
+}
+
+DATETIME_FORMATS = ("%m/%d/%Y %I:%M %p", "%m/%d/%Y %H:%M", "%m/%d/%Y")
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+@lru_cache(maxsize=4096)
+def parse_datetime(text: str) -> Optional[str]:
+    """Parse a portal timestamp into an ISO 8601 string, keeping its UTC offset.
+
+    The same few appointment times repeat every poll, so results are cached.
+    """
+    text = text.strip()
+    tz = None
+    parts = text.rsplit(" ", 1)
+    if len(parts) == 2 and parts[1].upper() in TIMEZONE_OFFSETS:
+        text = parts[0]
+        tz = timezone(timedelta(hours=TIMEZONE_OFFSETS[parts[1].upper()]))
+
+    for fmt in DATETIME_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return parsed.replace(tzinfo=tz).isoformat()
+    return None
+
+
+@lru_cache(maxsize=1)
+def portal_timezone():
+    """Zone of portal times without one (PORTAL_TIMEZONE), e.g. the dashboard's interpretationDate."""
+    from zoneinfo import ZoneInfo
+    try:
+        return ZoneInfo(PORTAL_TIMEZONE)
+    except Exception as e:
+        logger.error(f"Unknown PORTAL_TIMEZONE '{PORTAL_TIMEZONE}', using UTC: {str(e)}")
+        return timezone.utc
+
+
+@lru_cache(maxsize=4096)
+def iso_timestamp(iso_value: Optional[str]) -> Optional[float]:
+    """POSIX timestamp of an ISO datetime from parse_datetime.
+
+    Naive values are portal times in PORTAL_TIMEZONE, never the host's zone,
+    so they compare correctly with times that carry "EDT" and the like.
+    """
+    if not iso_value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(iso_value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=portal_timezone())
+    return parsed.timestamp()
+
+
+def parse_duration(text: str) -> Optional[int]:
+    """Parse a duration into minutes: "120", "90 min", "1:30" or "2h 15m"."""
+    text = text.strip().lower()
+    if not text:
+        return None
+    if ":" in text:
+        hours, _, minutes = text.partition(":")
+        try:
+            return int(hours) * 60 + int(minutes)
+        except ValueError:
+            return None
+    hours = re.search(r"(\d+(?:\.\d+)?)\s*h", text)
+    minutes = re.search(r"(\d+)\s*m", text)
+    if hours or minutes:
+        return round(float(hours.group(1)) * 60 if hours else 0) + (int(minutes.group(1)) if minutes else 0)
+    match = _NUMBER.search(text)
+    return round(float(match.group())) if match else None
+
+
+def parse_number(text: str) -> Optional[float]:
+    """Parse the first number in text ("68.64", "68.64 mi", "$1,200.50")."""
+    match = _NUMBER.search(text.replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def parse_int(text: str) -> Optional[int]:
+    number = parse_number(text)
+    return int(number) if number is not None else None
+
+
+def parse_language(text: str) -> Optional[str]:
+    """Language part of a request description ("Spanish - Other Appearance" -> "Spanish")."""
+    language = text.split(" - ", 1)[0].strip()
+    return language or None
+
+
+PARSERS: Dict[str, Callable[[str], object]] = {
+    "text": lambda text: text,
+    "int": parse_int,
+    "float": parse_number,
+    "distance": parse_number,
+    "duration": parse_duration,
+    "datetime": parse_datetime,
+    "language": parse_language,
+}
+
+# col-id -> where the cell text goes. "field" receives the raw text and
+# "typed_field" the value produced by the "type" parser. Every column,
+# mapped or not, is also kept verbatim in the job's "columns" dict.
+DEFAULT_COLUMN_SCHEMA = {
+    # Open Jobs grid
+    "requestID": {"field": "id"},
+    "customerName": {"field": "client_name"},
+    "interpretationTime": {"field": "appointment_time", "type": "datetime", "typed_field": "appointment_at"},
+    "estimateDuration": {"field": "duration", "type": "duration", "typed_field": "duration_minutes"},
+    "whereStr": {"field": "location"},
+    "requestDesc": {"field": "request_description", "type": "language", "typed_field": "language"},
+    "timeAndDistance.distanceInMile": {"field": "distance", "type": "distance", "typed_field": "distance_miles"},
+    # Assigned jobs grid
+    "requestId": {"field": "id"},
+    "interpretationDate": {"field": "appointment_time", "type": "datetime", "typed_field": "appointment_at"},
+    "estimatedDuration": {"field": "duration", "type": "duration", "typed_field": "duration_minutes"},
+    "estimatedAmount": {"field": "estimated_amount", "type": "float", "typed_field": "estimated_amount_value"},
+    # Older column names used by other portal versions
+    "customer": {"field": "client_name"},
+    "scheduledTime": {"field": "appointment_time", "type": "datetime", "typed_field": "appointment_at"},
+    "duration": {"field": "duration", "type": "duration", "typed_field": "duration_minutes"},
+    "address": {"field": "location"},
+    "location": {"field": "location"},
+}
+
+
+class ColumnRule(NamedTuple):
+    """Compiled schema entry for one column."""
+    col_id: str
+    field: Optional[str]
+    typed_field: Optional[str]
+    parser: Optional[Callable[[str], object]]
+
+
+def load_column_schema(path: str = COLUMN_SCHEMA_FILE) -> Dict[str, Dict]:
+    """Default schema overlaid with the optional JSON schema file."""
+    schema = dict(DEFAULT_COLUMN_SCHEMA)
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+            for col_id, entry in overrides.items():
+                if entry.get("type", "text") not in PARSERS:
+                    raise ValueError(f"unknown type '{entry['type']}' for column '{col_id}'")
+            schema.update(overrides)
+            logger.info(f"Loaded {len(overrides)} column overrides from {path}")
+        except Exception as e:
+            logger.error(f"Ignoring invalid column schema {path}: {str(e)}")
+    return schema
+
+
+class ColumnSchema:
+    """Column schema resolved into per-grid index-to-field dispatch tables."""
+
+    def __init__(self, schema: Optional[Dict[str, Dict]] = None):
+        self.schema = schema if schema is not None else load_column_schema()
+        self._rules: Dict[str, ColumnRule] = {}
+        self._tables: Dict[Tuple[str, ...], Tuple[ColumnRule, ...]] = {}
+
+    def rule(self, col_id: Optional[str]) -> ColumnRule:
+        """Compiled rule for one col-id (unknown columns are only kept raw)."""
+        rule = self._rules.get(col_id)
+        if rule is None:
+            entry = self.schema.get(col_id, {})
+            parser_type = entry.get("type")
+            rule = ColumnRule(
+                col_id,
+                entry.get("field"),
+                entry.get("typed_field"),
+                PARSERS[parser_type] if parser_type and entry.get("typed_field") else None,
+            )
+            self._rules[col_id] = rule
+        return rule
+
+    def compile(self, header: Tuple[str, ...]) -> Tuple[ColumnRule, ...]:
+        """Dispatch table for a grid header, built once per distinct header."""
+        table = self._tables.get(header)
+        if table is None:
+            table = tuple(self.rule(col_id) for col_id in header)
+            self._tables[header] = table
+        return table
+
+    @staticmethod
+    def apply(rule: ColumnRule, text: str, job: Dict):
+        """Store one cell's text (and its parsed value) in the job record."""
+        job["columns"][rule.col_id] = text
+        if rule.field:
+            job[rule.field] = text
+        if rule.parser:
+            try:
+                job[rule.typed_field] = rule.parser(text) if text else None
+            except Exception:
+                job[rule.typed_field] = None
+
+
+def header_col_ids(header_cells: Sequence) -> List[str]:
+    """col-ids of a grid's header cells, in display order, skipping unlabelled ones."""
+    col_ids = []
+    for cell in header_cells:
+        col_id = cell.get_attribute("col-id")
+        if col_id and col_id not in col_ids:
+            col_ids.append(col_id)
+    return col_ids
@@ -1,6 +1,10 @@
 import os
 from dotenv import load_dotenv
 
+# Variables set in the real environment win over the .env file, at startup
+# and on every reload (see live_config.py)
+PROCESS_ENV_KEYS = frozenset(os.environ)
+
 # Load environment variables
 load_dotenv()
 
@@ -17,8 +21,23 @@ JOB_POSTINGS_URL = f"{BASE_URL}/scheduler/#/jobs"
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
-# Scraping Settings
-SCRAPE_INTERVAL = int(os.getenv('SCRAPE_INTERVAL', '300'))
+# Channels every job notification fans out to: telegram, email, webhook, file
+NOTIFY_CHANNELS = os.getenv('NOTIFY_CHANNELS', 'telegram')
+CHANNEL_TIMEOUT = int(os.getenv('CHANNEL_TIMEOUT', '15'))  # Per send, per channel
+CHANNEL_FAILURE_THRESHOLD = int(os.getenv('CHANNEL_FAILURE_THRESHOLD', '3'))  # Failed sends before a channel is skipped
+CHANNEL_BACKOFF = int(os.getenv('CHANNEL_BACKOFF', '30'))  # First wait before retrying a skipped channel
+CHANNEL_MAX_BACKOFF = int(os.getenv('CHANNEL_MAX_BACKOFF', '600'))
+
+EMAIL_SMTP_SERVER = os.getenv('EMAIL_SMTP_SERVER', 'localhost')
+EMAIL_SMTP_PORT = int(os.getenv('EMAIL_SMTP_PORT', '587'))
+EMAIL_USERNAME = os.getenv('EMAIL_USERNAME')
+EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
+EMAIL_FROM = os.getenv('EMAIL_FROM', EMAIL_USERNAME or 'lsp-notifier@localhost')
+EMAIL_TO = os.getenv('EMAIL_TO', EMAIL_USERNAME or '')  # Comma-separated
+EMAIL_STARTTLS = os.getenv('EMAIL_STARTTLS', 'True').lower() in ('true', 'yes', '1')
+
+WEBHOOK_URLS = os.getenv('WEBHOOK_URLS', '')  # Comma-separated, each gets a JSON POST
+NOTIFY_FILE = os.getenv('NOTIFY_FILE', '-')  # JSON lines file for the file channel, "-" for stdout
 
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -28,6 +47,75 @@ LOG_FILE = os.getenv('LOG_FILE', 'logs/scraper.log')
 MAX_DATA_FILES = int(os.getenv('MAX_DATA_FILES', '5'))  # Maximum HTML files to keep
 MAX_SCREENSHOT_FILES = int(os.getenv('MAX_SCREENSHOT_FILES', '5'))  # Maximum screenshot files to keep
 CLEANUP_OLD_FILES = os.getenv('CLEANUP_OLD_FILES', 'True').lower() in ('true', 'yes', '1')
+# Screenshots and page sources of every step of every cycle; failures and changed grids are always saved
+SAVE_DEBUG_FILES = os.getenv('SAVE_DEBUG_FILES', 'False').lower() in ('true', 'yes', '1')
+
+# Deadlines and Watchdog (seconds; 0 disables a limit)
+CHECK_INTERVAL = int(os.getenv('CHECK_INTERVAL', '30'))  # Pause between successful cycles
+CYCLE_DEADLINE = int(os.getenv('CYCLE_DEADLINE', '300'))
+LOGIN_TIMEOUT = int(os.getenv('LOGIN_TIMEOUT', '120'))
+CHECK_TIMEOUT = int(os.getenv('CHECK_TIMEOUT', '150'))
+NOTIFY_TIMEOUT = int(os.getenv('NOTIFY_TIMEOUT', '120'))
+PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '60'))  # Per driver.get()
+SHUTDOWN_TIMEOUT = int(os.getenv('SHUTDOWN_TIMEOUT', '20'))  # Finishing notifications and saying goodbye on exit
+FAILURE_THRESHOLD = int(os.getenv('FAILURE_THRESHOLD', '3'))  # Failed cycles before backing off
+FAILURE_BACKOFF = int(os.getenv('FAILURE_BACKOFF', '60'))  # First retry delay after a failure
+MAX_FAILURE_BACKOFF = int(os.getenv('MAX_FAILURE_BACKOFF', '900'))
+HEARTBEAT_FILE = os.getenv('HEARTBEAT_FILE', 'state/heartbeat.json')
+
+# Cycle Recording (network responses + final DOM, replayed offline by replay.py)
+RECORD_CYCLES = os.getenv('RECORD_CYCLES', 'False').lower() in ('true', 'yes', '1')
+RECORDINGS_DIR = os.getenv('RECORDINGS_DIR', 'recordings')
+MAX_RECORDINGS = int(os.getenv('MAX_RECORDINGS', '200'))  # Maximum recorded cycles to keep
+
+# Optional JSON overrides for the grid column mapping (see columns.py)
+COLUMN_SCHEMA_FILE = os.getenv('COLUMN_SCHEMA_FILE', 'column_schema.json')
+PORTAL_TIMEZONE = os.getenv('PORTAL_TIMEZONE', 'America/New_York')  # Zone of portal times shown without one
+
+# Include/exclude rules applied to new jobs before notifying (see filters.py)
+JOB_FILTERS_FILE = os.getenv('JOB_FILTERS_FILE', 'job_filters.json')
+
+# Schedule conflicts with my assigned appointments: off, flag or suppress
+SCHEDULE_CONFLICTS = os.getenv('SCHEDULE_CONFLICTS', 'flag').lower()
+TRAVEL_BUFFER_MINUTES = int(os.getenv('TRAVEL_BUFFER_MINUTES', '45'))  # Added before and after each appointment
+DEFAULT_JOB_MINUTES = int(os.getenv('DEFAULT_JOB_MINUTES', '60'))  # Assumed length when a duration is missing
+
+# Auto-claim: off, dry-run (requests go to the local stand-in, claim_standin.py) or live
+AUTO_CLAIM_MODE = os.getenv('AUTO_CLAIM_MODE', 'off').lower()
+AUTO_CLAIM_RULES_FILE = os.getenv('AUTO_CLAIM_RULES_FILE', 'auto_claim_rules.json')  # Same format as job_filters.json
+AUTO_CLAIM_URL = os.getenv('AUTO_CLAIM_URL', '')  # Portal accept endpoint; {job_id} is substituted
+AUTO_CLAIM_DRY_RUN_URL = os.getenv('AUTO_CLAIM_DRY_RUN_URL', 'http://127.0.0.1:8765/claim/{job_id}')
+AUTO_CLAIM_PAYLOAD = os.getenv('AUTO_CLAIM_PAYLOAD', '{"requestID": {job_id}}')  # {job_id} becomes a JSON string
+AUTO_CLAIM_TOKEN_KEY = os.getenv('AUTO_CLAIM_TOKEN_KEY', '')  # localStorage key holding the portal's auth token
+AUTO_CLAIM_TIMEOUT = int(os.getenv('AUTO_CLAIM_TIMEOUT', '10'))
+AUTO_CLAIM_MAX_PER_CYCLE = int(os.getenv('AUTO_CLAIM_MAX_PER_CYCLE', '1'))
+
+# Notification order: weighted urgency, distance and duration scores (empty = grid order)
+PRIORITY_WEIGHTS = os.getenv('PRIORITY_WEIGHTS', 'urgency=0.6,distance=0.3,duration=0.1')
+URGENCY_HALF_LIFE_HOURS = float(os.getenv('URGENCY_HALF_LIFE_HOURS', '24'))  # Urgency halves per this many hours out
+DISTANCE_HALF_LIFE_MILES = float(os.getenv('DISTANCE_HALF_LIFE_MILES', '25'))  # Distance score halves per this many miles
+LONG_JOB_MINUTES = int(os.getenv('LONG_JOB_MINUTES', '240'))  # Jobs this long or longer get the full duration score
+
+# Offline distances to home bases from job ZIP codes (see geodistance.py)
+HOME_BASES = os.getenv('HOME_BASES', '')  # e.g. "Louisville:40204;Lexington:38.05,-84.49", empty = off
+ZIP_CENTROIDS_FILE = os.getenv('ZIP_CENTROIDS_FILE', 'zip_centroids.csv')
+GEO_CACHE_FILE = os.getenv('GEO_CACHE_FILE', 'state/geocache.json')
+GEO_CACHE_SIZE = int(os.getenv('GEO_CACHE_SIZE', '5000'))  # Addresses kept in the geocode cache
+
+# Archive of every observed job version, queried with history.py
+JOB_HISTORY = os.getenv('JOB_HISTORY', 'True').lower() in ('true', 'yes', '1')
+HISTORY_DB = os.getenv('HISTORY_DB', 'state/history.sqlite3')
+
+# Seen job IDs persisted between one-shot runs (main.py --once)
+STATE_FILE = os.getenv('STATE_FILE', 'state/seen_jobs.json')
+SEEN_JOBS_RETENTION_DAYS = float(os.getenv('SEEN_JOBS_RETENTION_DAYS', '30'))  # Forget jobs gone from the grid this long; 0 keeps all
+
+# Profiling output (main.py --profile N)
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+
+# Settings reloaded at runtime when this file changes or on SIGHUP (see live_config.py)
+CONFIG_FILE = os.getenv('CONFIG_FILE', '.env')
+CONFIG_POLL_INTERVAL = int(os.getenv('CONFIG_POLL_INTERVAL', '5'))  # Seconds between file checks, 0 = SIGHUP only
 
 # Headers
 DEFAULT_HEADERS = {
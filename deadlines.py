@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional
+
+from config import HEARTBEAT_FILE
+
+
+class Watchdog:
+    """Bound how long a cycle, or any phase of it, may run.
+
+    Selenium calls block the event loop, so ``asyncio.wait_for`` can't
+    interrupt a hung ``driver.get()`` or ``WebDriverWait``. Instead each guarded
+    block arms a timer thread. If the timer fires, ``on_overrun`` runs from that
+    thread, typically to kill the browser so the blocked call fails fast. The
+    owner checks ``consume_overrun()`` afterwards to recycle whatever was killed.
+    """
+
+    def __init__(self, on_overrun: Callable[[str], None]):
+        self.logger = logging.getLogger('LSPScraper.watchdog')
+        self.on_overrun = on_overrun
+        self._overrun_phase: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def guard(self, name: str, timeout: float):
+        """Fire on_overrun if the enclosed block runs longer than timeout seconds."""
+        if not timeout or timeout <= 0:
+            yield
+            return
+
+        timer = threading.Timer(timeout, self._expire, args=(name, timeout))
+        timer.daemon = True
+        timer.start()
+        try:
+            yield
+        finally:
+            timer.cancel()
+
+    def _expire(self, name: str, timeout: float):
+        with self._lock:
+            self._overrun_phase = name
+        self.logger.error(f"Watchdog: '{name}' exceeded its {timeout:.0f}s deadline, forcing recovery")
+        try:
+            self.on_overrun(name)
+        except Exception as e:
+            self.logger.error(f"Watchdog recovery for '{name}' failed: {str(e)}")
+
+    def consume_overrun(self) -> Optional[str]:
+        """Return the phase that overran since the last call, if any, and reset."""
+        with self._lock:
+            phase, self._overrun_phase = self._overrun_phase, None
+        return phase
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with exponential backoff.
+
+    Stays closed while calls succeed. After ``failure_threshold`` consecutive
+    failures it opens, and ``retry_after()`` grows from ``base_delay`` up to
+    ``max_delay`` until a success closes it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, base_delay: float = 60,
+                 max_delay: float = 900):
+        self.logger = logging.getLogger('LSPScraper.watchdog')
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """Whether a call should be attempted now (always true while closed)."""
+        return not self.is_open or time.monotonic() - self.opened_at >= self.retry_after()
+
+    def record_success(self):
+        if self.is_open:
+            self.logger.info(f"Circuit '{self.name}' closed after {self.consecutive_failures} failures")
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            if not self.is_open:
+                self.logger.warning(
+                    f"Circuit '{self.name}' opened after {self.consecutive_failures} consecutive failures"
+                )
+            # Restart the backoff window on every failure while open
+            self.opened_at = time.monotonic()
+
+    def retry_after(self) -> float:
+        """Seconds to wait before the next attempt."""
+        if not self.is_open:
+            return self.base_delay if self.consecutive_failures else 0
+        exponent = self.consecutive_failures - self.failure_threshold
+        return min(self.base_delay * (2 ** exponent), self.max_delay)
+
+    def snapshot(self) -> dict:
+        return {
+            "state": "open" if self.is_open else "closed",
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after": self.retry_after(),
+        }
+
+
+class Heartbeat:
+    """Write the monitor's liveness to a small JSON file after every cycle.
+
+    An external check (cron, systemd, a monitoring agent) can alert when
+    ``timestamp`` goes stale or ``last_success`` falls too far behind.
+    """
+
+    def __init__(self, path: str = HEARTBEAT_FILE):
+        self.logger = logging.getLogger('LSPScraper.watchdog')
+        self.path = path
+        self.last_success: Optional[str] = None
+
+    def beat(self, cycle: int, status: str, cycle_seconds: float, **fields):
+        now = datetime.now().isoformat()
+        if status == "ok":
+            self.last_success = now
+        record = {
+            "timestamp": now,
+            "pid": os.getpid(),
+            "cycle": cycle,
+            "status": status,
+            "cycle_seconds": round(cycle_seconds, 3),
+            "last_success": self.last_success,
+            **fields,
+        }
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.warning(f"Failed to write heartbeat: {str(e)}")
+        self.logger.info(
+            f"Heartbeat: cycle {cycle} {status} in {cycle_seconds:.1f}s"
+        )
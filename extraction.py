@@ -0,0 +1,261 @@
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from columns import ColumnSchema, ColumnRule, header_col_ids
+
+# Same value as selenium's By.CSS_SELECTOR, spelled out so this module (and the
+# offline replay driver that uses it) never has to import Selenium.
+CSS_SELECTOR = "css selector"
+
+GRID_SELECTOR = "ag-grid-angular, .ag-root, [role='grid'], table.grid"
+ROW_SELECTOR = "div[role='row'], .ag-row, tr"
+CELL_SELECTOR = "div[role='gridcell'], .ag-cell, td"
+HEADER_SELECTOR = ".ag-header-cell, th"
+
+# The Open Jobs grid is the one whose header has one of these columns; the
+# dashboard's grid of my own appointments has interpretationDate instead
+OPEN_JOBS_MARKER_COLUMNS = ("interpretationTime",)
+
+# Whether an Open Jobs grid is rendered, rather than hidden behind another tab
+OPEN_JOBS_VISIBLE_SCRIPT = r"""
+const [gridSelector, markers] = arguments;
+return Array.from(document.querySelectorAll(gridSelector)).some(grid =>
+    grid.getClientRects().length > 0
+    && Array.from(grid.querySelectorAll('.ag-header-cell[col-id]'))
+        .some(header => markers.includes(header.getAttribute('col-id'))));
+"""
+
+# Collects every row's ID and text in one WebDriver round-trip, walking the
+# same grids and rows (in the same order) as JobExtractor.extract_jobs.
+GRID_CONTENT_SCRIPT = r"""
+const [gridSelector, rowSelector] = arguments;
+const parts = [];
+for (const grid of document.querySelectorAll(gridSelector)) {
+    for (const row of grid.querySelectorAll(rowSelector)) {
+        parts.push((row.getAttribute('row-id') || '') + '\u001f' + row.innerText);
+    }
+    parts.push('\u001d');
+}
+return parts.join('\u001e');
+"""
+
+
+def fingerprint(content: str) -> str:
+    """Short, stable digest of the raw grid content."""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class JobExtractor:
+    """Turn grid rows into job dicts and diff them against already-seen jobs.
+
+    Works on anything that quacks like a Selenium WebElement (``find_elements``,
+    ``get_attribute`` and ``text``), so the same code runs against the live
+    browser and against recorded DOM snapshots.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, columns: Optional[ColumnSchema] = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.columns = columns or ColumnSchema()
+
+    def extract_jobs(self, grid_elements) -> List[Dict]:
+        """Extract a job dict for every non-empty row of every grid."""
+        jobs = []
+        for idx, grid in enumerate(grid_elements):
+            try:
+                # Resolve the header once into an index -> field dispatch table
+                header = tuple(header_col_ids(grid.find_elements(CSS_SELECTOR, HEADER_SELECTOR)))
+                table = self.columns.compile(header) if header else ()
+
+                # Try to find rows with various selectors
+                rows = grid.find_elements(CSS_SELECTOR, ROW_SELECTOR)
+
+                self.logger.info(f"Grid {idx} has {len(rows)} rows")
+
+                # Process each row to extract job information
+                for row_idx, row in enumerate(rows):
+                    try:
+                        job_details = self._extract_row(idx, row_idx, row, table)
+                        if job_details:
+                            jobs.append(job_details)
+                    except Exception as row_ex:
+                        self.logger.warning(f"Error processing row: {str(row_ex)}")
+            except Exception as grid_ex:
+                self.logger.warning(f"Error processing grid {idx}: {str(grid_ex)}")
+
+        return jobs
+
+    def _extract_row(self, grid_idx, row_idx, row, table: Sequence[ColumnRule] = ()) -> Optional[Dict]:
+        """Extract a single row, returning None for header and empty rows."""
+        # Skip header rows
+        if "header" in (row.get_attribute("class") or "").lower():
+            return None
+
+        # Get row text for logging
+        row_text = row.text.strip()
+
+        # Only process if row has content
+        if not row_text:
+            return None
+
+        self.logger.info(f"Processing row: {row_text}")
+
+        # Extract job ID
+        job_id = row.get_attribute("row-id") or f"job-{grid_idx}-{row_idx}"
+
+        # Find cells
+        cells = row.find_elements(CSS_SELECTOR, CELL_SELECTOR)
+
+        # If no job details but row has text, create a simple job entry
+        if len(cells) < 2:
+            job_details = {
+                "id": job_id,
+                "client_name": row_text,
+                "appointment_time": "",
+                "duration": "",
+                "location": "",
+                "description": row_text
+            }
+            self.logger.info(f"Added simplified job: {job_details}")
+            return job_details
+
+        # Normal job extraction with cells
+        return self.extract_job_details_from_cells(job_id, cells, table)
+
+    def extract_job_details_from_cells(self, job_id, cells, table: Sequence[ColumnRule] = ()) -> Dict:
+        """Extract job details from cells in a grid row.
+
+        With a header dispatch table whose layout matches the row, each cell
+        is mapped by position; otherwise each cell's col-id is looked up in the
+        column schema, and cells without one fall back to the legacy order.
+        """
+        job_details = self.new_job(job_id)
+
+        # One col-id read confirms the row is laid out like the header
+        use_table = (
+            len(table) == len(cells)
+            and bool(cells)
+            and cells[0].get_attribute("col-id") == table[0].col_id
+        )
+
+        for idx, cell in enumerate(cells):
+            try:
+                cell_text = cell.text.strip()
+                rule = table[idx] if use_table else self.columns.rule(cell.get_attribute("col-id"))
+
+                self.logger.info(f"Cell {idx} col-id: {rule.col_id}, text: {cell_text}")
+                self.apply_cell(job_details, idx, rule, cell_text)
+            except Exception as e:
+                self.logger.warning(f"Error processing cell {idx}: {str(e)}")
+
+        return self.finish_job(job_details, job_id)
+
+    @staticmethod
+    def new_job(job_id) -> Dict:
+        """Job record with every default field, before any cell is applied."""
+        return {
+            "id": job_id,
+            "client_name": "",
+            "appointment_time": "",
+            "duration": "",
+            "location": "",
+            "description": "",
+            "columns": {}
+        }
+
+    @staticmethod
+    def apply_cell(job_details: Dict, idx: int, rule: ColumnRule, cell_text: str):
+        """Map one cell into the job by its col-id, or by position when it has none."""
+        if rule.col_id:
+            ColumnSchema.apply(rule, cell_text, job_details)
+        elif idx == 0:
+            job_details["id"] = cell_text or job_details["id"]
+        elif idx == 1:
+            job_details["client_name"] = cell_text
+        elif idx == 2:
+            job_details["appointment_time"] = cell_text
+        elif idx == 3:
+            job_details["duration"] = cell_text
+        elif idx == 4:
+            job_details["location"] = cell_text
+
+    @staticmethod
+    def finish_job(job_details: Dict, job_id) -> Dict:
+        """Fill in what is derived from the cells once the whole row is read."""
+        # An empty requestID cell must not wipe out the row ID
+        if not job_details["id"]:
+            job_details["id"] = job_id
+
+        # Create description from available details
+        job_details["description"] = (
+            f"Client: {job_details['client_name']}\n"
+            f"Time: {job_details['appointment_time']}\n"
+            f"Duration: {job_details['duration']}\n"
+            f"Location: {job_details['location']}"
+        )
+
+        return job_details
+
+    @staticmethod
+    def diff_jobs(jobs: Iterable[Dict], seen_jobs: Set) -> List[Dict]:
+        """Return the jobs whose IDs are not in seen_jobs, marking them as seen."""
+        new_jobs = []
+        for job in jobs:
+            # The same row shows up in several nested grid containers, so the
+            # seen set is updated as we go to drop duplicates within a cycle too
+            if job["id"] not in seen_jobs:
+                new_jobs.append(job)
+                seen_jobs.add(job["id"])
+        return new_jobs
+
+
+def normalize_job_format(job):
+    """Normalize job data from different formats to a standard format"""
+    # Initialize with default empty values
+    normalized_job = {
+        "id": "",
+        "client_name": "",
+        "appointment_time": "",
+        "duration": "",
+        "location": "",
+        "description": ""
+    }
+
+    # Check what format the job data is in and convert appropriately
+    if isinstance(job, dict):
+        # If job already has the expected keys, use them directly
+        for key in normalized_job:
+            if key in job:
+                normalized_job[key] = job[key]
+
+        # Keep everything else the column schema captured (distance, language, ...)
+        for key, value in job.items():
+            normalized_job.setdefault(key, value)
+
+        # Handle legacy format with different key names
+        if "client" in job and not normalized_job["client_name"]:
+            normalized_job["client_name"] = job["client"]
+
+        if "title" in job:
+            if not normalized_job["description"]:
+                normalized_job["description"] = job["title"]
+
+        if "date" in job and not normalized_job["appointment_time"]:
+            normalized_job["appointment_time"] = job["date"]
+
+        # Ensure we have an ID
+        if not normalized_job["id"] and "id" in job:
+            normalized_job["id"] = job["id"]
+        elif not normalized_job["id"]:
+            # Generate a random ID if none exists
+            import random
+            normalized_job["id"] = f"job-{random.randint(1000, 9999)}"
+
+    # Ensure we have at least basic info for the notification
+    if not normalized_job["client_name"]:
+        normalized_job["client_name"] = "Unknown Client"
+
+    if not normalized_job["description"]:
+        normalized_job["description"] = "Job details not available"
+
+    return normalized_job
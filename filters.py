@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from config import JOB_FILTERS_FILE
+
+logger = logging.getLogger('LSPScraper.filters')
+
+
+def _appointment(job: Dict) -> Optional[datetime]:
+    value = job.get("appointment_at")
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+# Fields computed from the job record rather than read from it
+DERIVED_FIELDS: Dict[str, Callable[[Dict], object]] = {
+    "weekday": lambda job: _appointment(job).strftime("%a") if _appointment(job) else None,
+    "hour": lambda job: _appointment(job).hour if _appointment(job) else None,
+}
+
+
+def _getter(field: str) -> Callable[[Dict], object]:
+    """Compile a field reference into an accessor.
+
+    Plain names read the job record, "columns.<col-id>" reads a raw grid
+    cell and the names in DERIVED_FIELDS are computed.
+    """
+    if field in DERIVED_FIELDS:
+        return DERIVED_FIELDS[field]
+    if field.startswith("columns."):
+        col_id = field[len("columns."):]
+        return lambda job: job.get("columns", {}).get(col_id)
+    return lambda job: job.get(field)
+
+
+def _casefold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+def _compile_operator(op: str, value) -> Callable[[object], bool]:
+    """Compile an operator and its operand into a predicate over one field value.
+
+    String comparisons are case-insensitive. A missing (None) field never matches.
+    """
+    if op == "exists":
+        return lambda actual: (actual is not None and actual != "") == bool(value)
+    if op in ("eq", "ne"):
+        expected = _casefold(value)
+        if op == "eq":
+            return lambda actual: actual is not None and _casefold(actual) == expected
+        return lambda actual: actual is not None and _casefold(actual) != expected
+    if op in ("in", "not_in"):
+        options = frozenset(_casefold(option) for option in value)
+        if op == "in":
+            return lambda actual: actual is not None and _casefold(actual) in options
+        return lambda actual: actual is not None and _casefold(actual) not in options
+    if op in ("lt", "le", "gt", "ge"):
+        bound = float(value)
+        compare = {
+            "lt": float.__lt__, "le": float.__le__, "gt": float.__gt__, "ge": float.__ge__,
+        }[op]
+        return lambda actual: isinstance(actual, (int, float)) and compare(float(actual), bound)
+    if op == "between":
+        low, high = float(value[0]), float(value[1])
+        return lambda actual: isinstance(actual, (int, float)) and low <= actual <= high
+    if op == "contains":
+        needle = str(value).casefold()
+        return lambda actual: actual is not None and needle in str(actual).casefold()
+    if op == "matches":
+        pattern = re.compile(value, re.IGNORECASE)
+        return lambda actual: actual is not None and pattern.search(str(actual)) is not None
+    raise ValueError(f"unknown operator '{op}'")
+
+
+class Rule:
+    """One compiled include/exclude predicate with its hit counter."""
+
+    def __init__(self, name: str, field: str, op: str, value=None):
+        self.name = name
+        self.field = field
+        self.op = op
+        self.value = value
+        self.hits = 0
+        get = _getter(field)
+        test = _compile_operator(op, value)
+        self._evaluate = lambda job: test(get(job))
+
+    @classmethod
+    def from_dict(cls, spec: Dict, default_name: str) -> "Rule":
+        return cls(spec.get("name", default_name), spec["field"], spec["op"], spec.get("value", True))
+
+    def matches(self, job: Dict) -> bool:
+        try:
+            matched = self._evaluate(job)
+        except Exception:
+            matched = False
+        if matched:
+            self.hits += 1
+        return matched
+
+
+class JobFilter:
+    """Include/exclude rules applied to new jobs before they are notified.
+
+    A job is kept when it matches the include rules (all of them, or any one
+    with ``"include_mode": "any"``) and none of the exclude rules. Without
+    any rules every job is kept.
+    """
+
+    def __init__(self, include: Optional[List[Rule]] = None, exclude: Optional[List[Rule]] = None,
+                 include_mode: str = "all"):
+        if include_mode not in ("all", "any"):
+            raise ValueError(f"include_mode must be 'all' or 'any', not '{include_mode}'")
+        self.include = include or []
+        self.exclude = exclude or []
+        self.include_mode = include_mode
+        self.evaluated = 0
+        self.passed = 0
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "JobFilter":
+        """Compile a filter config; raises ValueError/KeyError on invalid rules."""
+        include = [Rule.from_dict(spec, f"include-{i}") for i, spec in enumerate(config.get("include", []))]
+        exclude = [Rule.from_dict(spec, f"exclude-{i}") for i, spec in enumerate(config.get("exclude", []))]
+        return cls(include, exclude, config.get("include_mode", "all"))
+
+    @classmethod
+    def load(cls, path: str) -> "JobFilter":
+        """Load rules from path, raising when the file is missing or invalid."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_file(cls, path: str = JOB_FILTERS_FILE) -> "JobFilter":
+        """Load rules from path, or return a pass-through filter when there is none."""
+        if not path or not os.path.exists(path):
+            return cls()
+        try:
+            job_filter = cls.load(path)
+            logger.info(
+                f"Loaded {len(job_filter.include)} include and {len(job_filter.exclude)} "
+                f"exclude rules from {path}"
+            )
+            return job_filter
+        except Exception as e:
+            logger.error(f"Ignoring invalid job filter file {path}: {str(e)}")
+            return cls()
+
+    @property
+    def rules(self) -> List[Rule]:
+        return self.include + self.exclude
+
+    def accepts(self, job: Dict) -> bool:
+        """Whether a single normalized job should be notified.
+
+        Every rule is evaluated, with no short-circuit, so each keeps an
+        accurate hit count.
+        """
+        include_hits = [rule.matches(job) for rule in self.include]
+        exclude_hits = [rule.matches(job) for rule in self.exclude]
+        if include_hits:
+            included = all(include_hits) if self.include_mode == "all" else any(include_hits)
+            if not included:
+                return False
+        return not any(exclude_hits)
+
+    def apply(self, jobs: List[Dict]) -> List[Dict]:
+        """Return the jobs that pass the filter, updating the counters."""
+        if not self.rules:
+            return jobs
+        kept = [job for job in jobs if self.accepts(job)]
+        self.evaluated += len(jobs)
+        self.passed += len(kept)
+        if len(kept) != len(jobs):
+            logger.info(f"Job filter dropped {len(jobs) - len(kept)} of {len(jobs)} new jobs")
+        return kept
+
+    def stats(self) -> Dict:
+        """Counters suitable for logging or the heartbeat file."""
+        return {
+            "evaluated": self.evaluated,
+            "passed": self.passed,
+            "rule_hits": {rule.name: rule.hits for rule in self.rules},
+        }
@@ -0,0 +1,266 @@
+"""Offline distances from job addresses to every configured home base.
+
+Usage:
+    python geodistance.py import 2020_Gaz_zcta_national.txt [--out zip_centroids.csv]
+    python geodistance.py distance "969B Cherokee Road, Louisville, KY, 40204"
+
+Addresses are geocoded by their trailing ZIP code against a bundled table of
+ZIP centroids (ZIP_CENTROIDS_FILE), so no geocoding API is ever called. The
+bundled table is only a seed for the Kentucky service area, some of it rounded
+to two decimals; ``import`` replaces it with every ZCTA from the Census
+Bureau's Gazetteer file. A ZIP missing from the table is logged once.
+
+Geocoded addresses are kept in a persistent LRU cache (GEO_CACHE_FILE), so
+the ZIP table is only loaded when an address has not been placed before.
+"""
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import re
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from config import HOME_BASES, ZIP_CENTROIDS_FILE, GEO_CACHE_FILE, GEO_CACHE_SIZE
+
+logger = logging.getLogger('LSPScraper.geodistance')
+
+EARTH_RADIUS_MILES = 3958.8
+
+# "Louisville, KY, 40204" or "Louisville, KY 40204-1234"
+TRAILING_ZIP = re.compile(r"\b(\d{5})(?:-\d{4})?\s*$")
+
+Point = Tuple[float, float]
+
+
+def extract_zip(address: Optional[str]) -> Optional[str]:
+    """The ZIP code at the end of an address, if there is one."""
+    if not address:
+        return None
+    match = TRAILING_ZIP.search(address.strip())
+    return match.group(1) if match else None
+
+
+def load_zip_table(path: str = ZIP_CENTROIDS_FILE) -> Dict[str, Point]:
+    """ZIP -> (latitude, longitude) from a zip,lat,lon CSV file."""
+    table = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            table[row["zip"]] = (float(row["lat"]), float(row["lon"]))
+    return table
+
+
+def great_circle_miles(points: Sequence[Point], bases: Sequence[Point]) -> List[List[float]]:
+    """Haversine distance from every point to every base, as rows per point."""
+    if not points or not bases:
+        return [[] for _ in points]
+    # The base terms are the same for every point, so they are computed once
+    bases_rad = [(math.radians(lat), math.radians(lon), math.cos(math.radians(lat))) for lat, lon in bases]
+    rows = []
+    for lat, lon in points:
+        lat1, lon1 = math.radians(lat), math.radians(lon)
+        cos_lat1 = math.cos(lat1)
+        row = []
+        for lat2, lon2, cos_lat2 in bases_rad:
+            a = math.sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * cos_lat2 * math.sin((lon2 - lon1) / 2) ** 2
+            row.append(2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(min(a, 1.0))))
+        rows.append(row)
+    return rows
+
+
+class GeoCache:
+    """Address -> geocode result, least recently used entries evicted first.
+
+    Only hits are stored. A miss may stop being one once ``import`` has added
+    its ZIP to the table, so it is looked up again every time.
+    """
+
+    def __init__(self, path: str = GEO_CACHE_FILE, max_entries: int = GEO_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                # Caches written by older versions also hold misses as null
+                self.entries.update((address, result) for address, result in json.load(f).items() if result)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Ignoring unreadable geocode cache {path}: {str(e)}")
+
+    def __contains__(self, address: str) -> bool:
+        return address in self.entries
+
+    def get(self, address: str) -> Dict:
+        self.entries.move_to_end(address)
+        return self.entries[address]
+
+    def put(self, address: str, result: Dict):
+        self.entries[address] = result
+        self.entries.move_to_end(address)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def save(self):
+        """Write the cache atomically, if anything changed since the last save."""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+class GeoDistance:
+    """Annotate jobs with their great-circle distance to each home base."""
+
+    def __init__(self, bases: str = HOME_BASES, table_path: str = ZIP_CENTROIDS_FILE,
+                 cache: Optional[GeoCache] = None):
+        self.table_path = table_path
+        self._table: Optional[Dict[str, Point]] = None
+        self.cache = cache if cache is not None else GeoCache()
+        # ZIPs already reported as missing from the table
+        self.unknown_zips: Set[str] = set()
+        self.bases = self.parse_bases(bases)
+
+    @property
+    def table(self) -> Dict[str, Point]:
+        """ZIP centroid table, loaded on the first cache miss."""
+        if self._table is None:
+            try:
+                self._table = load_zip_table(self.table_path)
+            except Exception as e:
+                logger.error(f"Could not load ZIP centroids from {self.table_path}: {str(e)}")
+                self._table = {}
+        return self._table
+
+    def parse_bases(self, spec: str) -> List[Tuple[str, Point]]:
+        """Parse "Louisville:40204;Lexington:38.05,-84.49" into named points.
+
+        A base is given by ZIP code or by latitude,longitude. Bases that can't
+        be placed are logged and skipped.
+        """
+        bases = []
+        for entry in spec.split(";"):
+            if not entry.strip():
+                continue
+            name, _, where = entry.partition(":")
+            name, where = name.strip(), where.strip()
+            try:
+                if "," in where:
+                    lat, lon = (float(part) for part in where.split(","))
+                    point = (lat, lon)
+                else:
+                    point = self.table[where]
+                bases.append((name, point))
+            except (KeyError, ValueError):
+                logger.error(f"Ignoring home base '{entry.strip()}': expected name:ZIP or name:lat,lon with a known ZIP")
+        return bases
+
+    def geocode(self, address: Optional[str]) -> Optional[Dict]:
+        """{"zip", "lat", "lon"} for an address, or None when it has no known ZIP."""
+        if not address:
+            return None
+        address = " ".join(address.split())
+        if address in self.cache:
+            return self.cache.get(address)
+        zip_code = extract_zip(address)
+        point = self.table.get(zip_code) if zip_code else None
+        if point is None:
+            if zip_code and zip_code not in self.unknown_zips:
+                self.unknown_zips.add(zip_code)
+                logger.warning(
+                    f"ZIP {zip_code} is not in {self.table_path}, no distances for its jobs; "
+                    f"run 'python geodistance.py import' to load every US ZIP"
+                )
+            return None
+        result = {"zip": zip_code, "lat": point[0], "lon": point[1]}
+        self.cache.put(address, result)
+        return result
+
+    def annotate(self, jobs: List[Dict]) -> List[Dict]:
+        """Add base_distances, nearest_base and nearest_base_miles to every placeable job."""
+        if not self.bases:
+            return jobs
+        located = []
+        for job in jobs:
+            result = self.geocode(job.get("location"))
+            if result:
+                job["zip_code"] = result["zip"]
+                located.append((job, (result["lat"], result["lon"])))
+
+        matrix = great_circle_miles([point for _, point in located], [point for _, point in self.bases])
+        for (job, _), row in zip(located, matrix):
+            distances = {name: round(miles, 1) for (name, _), miles in zip(self.bases, row)}
+            nearest = min(distances, key=distances.get)
+            job["base_distances"] = distances
+            job["nearest_base"] = nearest
+            job["nearest_base_miles"] = distances[nearest]
+
+        try:
+            self.cache.save()
+        except Exception as e:
+            logger.warning(f"Could not save geocode cache: {str(e)}")
+        return jobs
+
+
+def import_gazetteer(source: str, out: str) -> int:
+    """Convert a Census ZCTA Gazetteer file (tab-separated) into the zip,lat,lon table."""
+    count = 0
+    with open(source, "r", encoding="utf-8", newline="") as f, \
+            open(out, "w", encoding="utf-8", newline="") as out_file:
+        reader = csv.reader(f, delimiter="\t")
+        header = [column.strip() for column in next(reader)]
+        zip_idx, lat_idx, lon_idx = header.index("GEOID"), header.index("INTPTLAT"), header.index("INTPTLONG")
+        writer = csv.writer(out_file)
+        writer.writerow(["zip", "lat", "lon"])
+        for row in reader:
+            writer.writerow([
+                row[zip_idx].strip(),
+                f"{float(row[lat_idx]):.4f}",
+                f"{float(row[lon_idx]):.4f}",
+            ])
+            count += 1
+    return count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline ZIP-centroid distances to home bases")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="build the ZIP table from a Census ZCTA Gazetteer file")
+    import_parser.add_argument("source")
+    import_parser.add_argument("--out", default=ZIP_CENTROIDS_FILE)
+    distance_parser = subparsers.add_parser("distance", help="distance from an address to every home base")
+    distance_parser.add_argument("address")
+    distance_parser.add_argument("--bases", default=HOME_BASES, help="default: HOME_BASES")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        count = import_gazetteer(args.source, args.out)
+        print(f"Wrote {count} ZIP centroids to {args.out}")
+        return 0
+
+    geo = GeoDistance(args.bases)
+    if not geo.bases:
+        print("No usable home bases; set HOME_BASES or pass --bases")
+        return 1
+    job = geo.annotate([{"location": args.address}])[0]
+    if "base_distances" not in job:
+        print(f"No known ZIP code in '{args.address}'")
+        return 1
+    for name, miles in sorted(job["base_distances"].items(), key=lambda item: item[1]):
+        print(f"{name:<20} {miles:>8.1f} mi")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+"""Archive of every job the scraper has observed, with a small query CLI.
+
+Usage:
+    python history.py postings [--days N]
+    python history.py fill-time [--days N]
+    python history.py customers [--days N] [--limit N]
+    python history.py job JOB_ID
+
+Each job is one row holding its first-seen, last-seen and removal time plus its
+latest fields. Field changes are stored as deltas in a separate table, and only
+polls where the grid actually changed add a cycle row. Unchanged polls just
+move last_seen forward, so the archive grows with postings, not with polls.
+Polls that could not see the Open Jobs grid are recorded as skipped and
+change nothing else.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import HISTORY_DB
+
+logger = logging.getLogger('LSPScraper.history')
+
+# Promoted to real columns so the CLI can filter and group on them
+INDEXED_FIELDS = ("client_name", "appointment_at", "duration_minutes", "distance_miles", "language", "location")
+
+# Keys of an extracted job that are not part of its versioned fields
+UNVERSIONED_KEYS = ("id", "columns")
+
+WEEKDAYS = ("Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    removed_at REAL,
+    versions INTEGER NOT NULL DEFAULT 1,
+    client_name TEXT,
+    appointment_at TEXT,
+    duration_minutes INTEGER,
+    distance_miles REAL,
+    language TEXT,
+    location TEXT,
+    fields TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_jobs_first_seen ON jobs (first_seen);
+CREATE INDEX IF NOT EXISTS idx_jobs_removed_at ON jobs (removed_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_client ON jobs (client_name, first_seen);
+
+CREATE TABLE IF NOT EXISTS job_changes (
+    job_id TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    changes TEXT NOT NULL,
+    PRIMARY KEY (job_id, observed_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS cycles (
+    observed_at REAL PRIMARY KEY,
+    job_count INTEGER NOT NULL,
+    new_count INTEGER,
+    check_seconds REAL,
+    skipped INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+
+def _versioned_fields(job: Dict) -> Dict:
+    return {key: value for key, value in job.items() if key not in UNVERSIONED_KEYS}
+
+
+def _digest(fields: Dict) -> bytes:
+    encoded = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).digest()
+
+
+class JobHistory:
+    """Append-only record of job versions backed by SQLite.
+
+    The open (not yet removed) jobs are cached in memory with a digest of
+    their fields, so a poll only writes rows for jobs that appeared, changed
+    or disappeared.
+    """
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        # Archives created before skipped polls were recorded
+        if "skipped" not in {row[1] for row in self.conn.execute("PRAGMA table_info(cycles)")}:
+            self.conn.execute("ALTER TABLE cycles ADD COLUMN skipped INTEGER NOT NULL DEFAULT 0")
+        self._open: Optional[Dict[str, Tuple[bytes, Dict]]] = None
+        self._batching = False
+
+    @contextmanager
+    def batch(self):
+        """Group many observations into one transaction, as the log backfill does."""
+        self._batching = True
+        try:
+            with self.conn:
+                yield
+        except Exception:
+            # Rolled back, so the cached open jobs may be ahead of the database
+            self._open = None
+            raise
+        finally:
+            self._batching = False
+
+    def _transaction(self):
+        return nullcontext() if self._batching else self.conn
+
+    def last_observed(self) -> Optional[float]:
+        """Time of the newest poll in the archive."""
+        row = self.conn.execute("SELECT MAX(last_seen) FROM jobs").fetchone()
+        cycle = self.conn.execute("SELECT MAX(observed_at) FROM cycles").fetchone()
+        return max((value for value in (row[0], cycle[0]) if value is not None), default=None)
+
+    def _open_jobs(self) -> Dict[str, Tuple[bytes, Dict]]:
+        if self._open is None:
+            self._open = {}
+            for job_id, fields in self.conn.execute("SELECT job_id, fields FROM jobs WHERE removed_at IS NULL"):
+                fields = json.loads(fields)
+                self._open[job_id] = (_digest(fields), fields)
+        return self._open
+
+    def observe(self, jobs: List[Dict], observed_at: Optional[float] = None,
+                new_count: Optional[int] = None, check_seconds: Optional[float] = None):
+        """Record the complete list of open jobs seen by one poll."""
+        observed_at = observed_at or time.time()
+        open_jobs = self._open_jobs()
+        current = {}
+        for job in jobs:
+            if job.get("id"):
+                current[str(job["id"])] = _versioned_fields(job)
+
+        with self._transaction():
+            for job_id, fields in current.items():
+                digest = _digest(fields)
+                known = open_jobs.get(job_id)
+                if known is None:
+                    self._insert(job_id, fields, observed_at)
+                elif known[0] != digest:
+                    self._update(job_id, known[1], fields, observed_at)
+                open_jobs[job_id] = (digest, fields)
+
+            removed = [job_id for job_id in open_jobs if job_id not in current]
+            self.conn.executemany(
+                "UPDATE jobs SET removed_at = ? WHERE job_id = ?",
+                [(observed_at, job_id) for job_id in removed]
+            )
+            for job_id in removed:
+                del open_jobs[job_id]
+
+            self.conn.execute("UPDATE jobs SET last_seen = ? WHERE removed_at IS NULL", (observed_at,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cycles (observed_at, job_count, new_count, check_seconds) VALUES (?, ?, ?, ?)",
+                (observed_at, len(current), new_count, check_seconds)
+            )
+
+    def skip(self, observed_at: Optional[float] = None, check_seconds: Optional[float] = None):
+        """Record a poll that could not see the open jobs, leaving every job's state alone.
+
+        Its job list is incomplete, so treating it as one would mark every
+        missing job removed and then reposted on the next poll.
+        """
+        with self._transaction():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cycles (observed_at, job_count, new_count, check_seconds, skipped) "
+                "VALUES (?, 0, NULL, ?, 1)",
+                (observed_at or time.time(), check_seconds)
+            )
+
+    def touch(self, observed_at: Optional[float] = None):
+        """Mark every open job as still listed, for polls where the grid did not change."""
+        with self._transaction():
+            self.conn.execute(
+                "UPDATE jobs SET last_seen = ? WHERE removed_at IS NULL", (observed_at or time.time(),)
+            )
+
+    def _insert(self, job_id: str, fields: Dict, observed_at: float):
+        indexed = [fields.get(name) for name in INDEXED_FIELDS]
+        encoded = json.dumps(fields, separators=(",", ":"), default=str)
+        # A reposted job keeps its first_seen; the reappearance is logged as a change
+        cursor = self.conn.execute(
+            "UPDATE jobs SET removed_at = NULL, last_seen = ?, versions = versions + 1, fields = ?, "
+            + ", ".join(f"{name} = ?" for name in INDEXED_FIELDS)
+            + " WHERE job_id = ?",
+            (observed_at, encoded, *indexed, job_id)
+        )
+        if cursor.rowcount:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO job_changes (job_id, observed_at, changes) VALUES (?, ?, ?)",
+                (job_id, observed_at, json.dumps({"reposted": True}))
+            )
+            return
+        self.conn.execute(
+            f"INSERT INTO jobs (job_id, first_seen, last_seen, fields, {', '.join(INDEXED_FIELDS)}) "
+            f"VALUES (?, ?, ?, ?, {', '.join('?' for _ in INDEXED_FIELDS)})",
+            (job_id, observed_at, observed_at, encoded, *indexed)
+        )
+
+    def _update(self, job_id: str, old: Dict, new: Dict, observed_at: float):
+        changes = {
+            key: [old.get(key), new.get(key)]
+            for key in old.keys() | new.keys()
+            if old.get(key) != new.get(key)
+        }
+        self.conn.execute(
+            "UPDATE jobs SET versions = versions + 1, fields = ?, "
+            + ", ".join(f"{name} = ?" for name in INDEXED_FIELDS)
+            + " WHERE job_id = ?",
+            (json.dumps(new, separators=(",", ":"), default=str),
+             *[new.get(name) for name in INDEXED_FIELDS], job_id)
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO job_changes (job_id, observed_at, changes) VALUES (?, ?, ?)",
+            (job_id, observed_at, json.dumps(changes, separators=(",", ":"), default=str))
+        )
+
+    def postings_by_hour(self, since: float = 0) -> List[Tuple[int, int, int]]:
+        """(weekday 0=Sunday, hour, count) of new postings, in local time."""
+        return self.conn.execute(
+            "SELECT CAST(strftime('%w', first_seen, 'unixepoch', 'localtime') AS INTEGER) AS weekday, "
+            "CAST(strftime('%H', first_seen, 'unixepoch', 'localtime') AS INTEGER) AS hour, COUNT(*) "
+            "FROM jobs WHERE first_seen >= ? GROUP BY weekday, hour ORDER BY weekday, hour",
+            (since,)
+        ).fetchall()
+
+    def fill_times(self, since: float = 0) -> List[float]:
+        """Seconds each removed job stayed listed, for jobs first seen since `since`."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT removed_at - first_seen FROM jobs WHERE first_seen >= ? AND removed_at IS NOT NULL",
+            (since,)
+        )]
+
+    def top_customers(self, since: float = 0, limit: int = 10) -> List[Tuple[str, int, Optional[float]]]:
+        """(customer, postings, average minutes listed) ordered by postings."""
+        return self.conn.execute(
+            "SELECT client_name, COUNT(*), AVG(removed_at - first_seen) / 60 FROM jobs "
+            "WHERE first_seen >= ? AND client_name IS NOT NULL AND client_name != '' "
+            "GROUP BY client_name ORDER BY COUNT(*) DESC LIMIT ?",
+            (since, limit)
+        ).fetchall()
+
+    def job(self, job_id: str) -> Optional[Dict]:
+        """The archived record of one job with its change log."""
+        row = self.conn.execute(
+            "SELECT first_seen, last_seen, removed_at, versions, fields FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": job_id,
+            "first_seen": row[0],
+            "last_seen": row[1],
+            "removed_at": row[2],
+            "versions": row[3],
+            "fields": json.loads(row[4]),
+            "changes": [
+                {"observed_at": observed_at, "changes": json.loads(changes)}
+                for observed_at, changes in self.conn.execute(
+                    "SELECT observed_at, changes FROM job_changes WHERE job_id = ? ORDER BY observed_at", (job_id,)
+                )
+            ],
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+def _format_time(timestamp: Optional[float]) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else "-"
+
+
+def print_postings(history: JobHistory, since: float):
+    counts = {(weekday, hour): count for weekday, hour, count in history.postings_by_hour(since)}
+    print("Postings per hour (local time of first sighting)")
+    print("     " + "".join(f"{hour:>4}" for hour in range(24)) + "   total")
+    for weekday, name in enumerate(WEEKDAYS):
+        row = [counts.get((weekday, hour), 0) for hour in range(24)]
+        print(f"{name:<5}" + "".join(f"{count or '.':>4}" for count in row) + f"{sum(row):>8}")
+
+
+def print_fill_time(history: JobHistory, since: float):
+    samples = sorted(history.fill_times(since))
+    if not samples:
+        print("No removed jobs in range")
+        return
+    minutes = [sample / 60 for sample in samples]
+    quartiles = statistics.quantiles(minutes, n=4) if len(minutes) > 1 else [minutes[0]] * 3
+    print(f"Time to fill over {len(minutes)} jobs (minutes listed before removal)")
+    print(f"  median {statistics.median(minutes):.1f}  p25 {quartiles[0]:.1f}  p75 {quartiles[2]:.1f}  "
+          f"min {minutes[0]:.1f}  max {minutes[-1]:.1f}")
+
+
+def print_customers(history: JobHistory, since: float, limit: int):
+    print(f"{'customer':<40} {'postings':>8} {'avg min listed':>15}")
+    for client_name, count, listed in history.top_customers(since, limit):
+        # Customers whose postings are all still open have no time listed yet
+        listed_cell = "-" if listed is None else f"{listed:.1f}"
+        print(f"{client_name[:40]:<40} {count:>8} {listed_cell:>15}")
+
+
+def print_job(history: JobHistory, job_id: str) -> int:
+    record = history.job(job_id)
+    if record is None:
+        print(f"Job {job_id} is not in the archive")
+        return 1
+    print(f"Job {job_id}: first seen {_format_time(record['first_seen'])}, "
+          f"last seen {_format_time(record['last_seen'])}, removed {_format_time(record['removed_at'])}, "
+          f"{record['versions']} versions")
+    print(json.dumps(record["fields"], indent=2, default=str))
+    for change in record["changes"]:
+        print(f"  {_format_time(change['observed_at'])}: {json.dumps(change['changes'], default=str)}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Query the archive of observed LSP jobs")
+    parser.add_argument("--db", default=HISTORY_DB, help="archive path (default: %(default)s)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (
+        ("postings", "postings per hour by weekday"),
+        ("fill-time", "how long jobs stay listed before they are taken"),
+        ("customers", "customers with the most postings"),
+    ):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--days", type=float, default=None, help="only jobs first seen in the last N days")
+        if name == "customers":
+            subparser.add_argument("--limit", type=int, default=10)
+    job_parser = subparsers.add_parser("job", help="one job's versions and change log")
+    job_parser.add_argument("job_id")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No archive at {args.db}")
+        return 1
+    history = JobHistory(args.db)
+    try:
+        since = time.time() - args.days * 86400 if getattr(args, "days", None) else 0
+        if args.command == "postings":
+            print_postings(history, since)
+        elif args.command == "fill-time":
+            print_fill_time(history, since)
+        elif args.command == "customers":
+            print_customers(history, since, args.limit)
+        else:
+            return print_job(history, args.job_id)
+        return 0
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
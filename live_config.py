@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, Optional
+
+import config
+from channels import CHANNEL_SETTINGS, CHANNEL_TYPES, build_channels
+from config import CONFIG_FILE, CONFIG_POLL_INTERVAL, PROCESS_ENV_KEYS
+from filters import JobFilter
+from priority import parse_weights
+
+logger = logging.getLogger('LSPScraper.config')
+
+
+def _text(value: str) -> str:
+    return value.strip()
+
+
+def _optional_text(value: str) -> Optional[str]:
+    return value.strip() or None
+
+
+def _seconds(value: str) -> int:
+    seconds = int(value)
+    if seconds < 0:
+        raise ValueError("must be 0 or more")
+    return seconds
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise ValueError("must be at least 1")
+    return number
+
+
+def _port(value: str) -> int:
+    port = int(value)
+    if not 0 < port < 65536:
+        raise ValueError("must be between 1 and 65535")
+    return port
+
+
+def _flag(value: str) -> bool:
+    if value.strip().lower() not in ("true", "yes", "1", "false", "no", "0"):
+        raise ValueError("must be true or false")
+    return value.strip().lower() in ("true", "yes", "1")
+
+
+def _log_level(value: str) -> str:
+    level = value.strip().upper()
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError("must be DEBUG, INFO, WARNING, ERROR or CRITICAL")
+    return level
+
+
+def _weights(value: str) -> str:
+    parse_weights(value)
+    return value.strip()
+
+
+def _channel_names(value: str) -> str:
+    unknown = [name for name in value.split(",") if name.strip() and name.strip().lower() not in CHANNEL_TYPES]
+    if unknown:
+        raise ValueError(f"unknown channels {unknown}, expected some of {list(CHANNEL_TYPES)}")
+    return value.strip()
+
+
+def _urls(value: str) -> str:
+    for url in value.split(","):
+        if url.strip() and not url.strip().startswith(("http://", "https://")):
+            raise ValueError(f"'{url.strip()}' is not an http(s) URL")
+    return value.strip()
+
+
+# Settings that take effect without a restart, with the parser validating each.
+# Anything else in the config file (credentials, LOG_FILE, ...) needs a restart.
+RELOADABLE_SETTINGS: Dict[str, Callable[[str], object]] = {
+    "LOG_LEVEL": _log_level,
+    "CHECK_INTERVAL": _seconds,
+    "FAILURE_THRESHOLD": _positive_int,
+    "FAILURE_BACKOFF": _seconds,
+    "MAX_FAILURE_BACKOFF": _seconds,
+    "JOB_FILTERS_FILE": _text,
+    "PRIORITY_WEIGHTS": _weights,
+    "TELEGRAM_BOT_TOKEN": _optional_text,
+    "TELEGRAM_CHAT_ID": _optional_text,
+    "NOTIFY_CHANNELS": _channel_names,
+    "CHANNEL_TIMEOUT": _seconds,
+    "CHANNEL_FAILURE_THRESHOLD": _positive_int,
+    "CHANNEL_BACKOFF": _seconds,
+    "CHANNEL_MAX_BACKOFF": _seconds,
+    "EMAIL_SMTP_SERVER": _text,
+    "EMAIL_SMTP_PORT": _port,
+    "EMAIL_USERNAME": _optional_text,
+    "EMAIL_PASSWORD": _optional_text,
+    "EMAIL_FROM": _text,
+    "EMAIL_TO": _text,
+    "EMAIL_STARTTLS": _flag,
+    "WEBHOOK_URLS": _urls,
+    "NOTIFY_FILE": _text,
+}
+
+NOTIFICATION_SETTINGS = CHANNEL_SETTINGS + ("TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID")
+
+
+def startup_settings() -> Dict:
+    """The reloadable settings as config.py loaded them at startup."""
+    return {key: getattr(config, key) for key in RELOADABLE_SETTINGS}
+
+
+def _read_file(path: str) -> Dict[str, str]:
+    """The file's values, minus the keys the process environment sets.
+
+    load_dotenv() at startup never overrides the environment, so neither
+    does a reload.
+    """
+    from dotenv import dotenv_values
+    if not os.path.exists(path):
+        return {}
+    return {
+        key: value for key, value in dotenv_values(path).items()
+        if value is not None and key not in PROCESS_ENV_KEYS
+    }
+
+
+def _mtime(path: Optional[str]) -> Optional[float]:
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+class ConfigReloader:
+    """Re-read the config file and apply its reloadable settings to a running scraper.
+
+    A reload happens when the config file or the job filter file changes, or
+    on request (SIGHUP). The new settings, job filter and notification channels
+    are all built and validated first. If anything is invalid the whole reload
+    is rejected and the running config stays untouched. Otherwise everything is
+    swapped in one step, between cycles.
+
+    Keys missing from the file keep the value they had at startup, and so do
+    keys set in the process environment, which take precedence over the file
+    as they do at startup.
+    """
+
+    def __init__(self, scraper, path: str = CONFIG_FILE, poll_interval: float = CONFIG_POLL_INTERVAL):
+        self.scraper = scraper
+        self.path = path
+        self.poll_interval = poll_interval
+        self.defaults = startup_settings()
+        self.settings = dict(self.defaults)
+        self._file_values = _read_file(path)
+        self._config_mtime = _mtime(path)
+        self._filters_mtime = _mtime(self.settings["JOB_FILTERS_FILE"])
+        self._requested = asyncio.Event()
+
+    def request(self):
+        """Ask for a reload at the next check, e.g. from a SIGHUP handler."""
+        self._requested.set()
+
+    async def wait(self, timeout: float):
+        """Sleep up to timeout seconds, waking early when a reload is requested."""
+        if timeout <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._requested.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def changed(self) -> bool:
+        return (
+            self._requested.is_set()
+            or _mtime(self.path) != self._config_mtime
+            or _mtime(self.settings["JOB_FILTERS_FILE"]) != self._filters_mtime
+        )
+
+    def parse(self, file_values: Dict[str, str]) -> Dict:
+        """Validated settings: startup values overridden by the file's; raises ValueError."""
+        settings = dict(self.defaults)
+        problems = []
+        for key, parse in RELOADABLE_SETTINGS.items():
+            if key not in file_values:
+                continue
+            try:
+                settings[key] = parse(file_values[key])
+            except ValueError as e:
+                problems.append(f"{key}: {str(e)}")
+        if settings["MAX_FAILURE_BACKOFF"] < settings["FAILURE_BACKOFF"]:
+            problems.append("MAX_FAILURE_BACKOFF: must not be below FAILURE_BACKOFF")
+        if settings["CHANNEL_MAX_BACKOFF"] < settings["CHANNEL_BACKOFF"]:
+            problems.append("CHANNEL_MAX_BACKOFF: must not be below CHANNEL_BACKOFF")
+        if problems:
+            raise ValueError("; ".join(problems))
+        return settings
+
+    async def check(self) -> bool:
+        """Reload if anything changed; True when new settings were applied."""
+        if not self.changed():
+            return False
+        return await self.reload()
+
+    async def reload(self) -> bool:
+        self._requested.clear()
+        self._config_mtime = _mtime(self.path)
+        manager = self.scraper.notification_manager
+        try:
+            file_values = _read_file(self.path)
+            settings = self.parse(file_values)
+
+            filters_path = settings["JOB_FILTERS_FILE"]
+            filters_mtime = _mtime(filters_path)
+            job_filter = None
+            if filters_path != self.settings["JOB_FILTERS_FILE"] or filters_mtime != self._filters_mtime:
+                job_filter = JobFilter.load(filters_path) if filters_mtime is not None else JobFilter()
+
+            channels = None
+            if any(settings[key] != self.settings[key] for key in NOTIFICATION_SETTINGS):
+                # Rebuilt only when they changed, so breakers and open connections survive
+                channels = build_channels(manager, {key: settings[key] for key in CHANNEL_SETTINGS})
+        except Exception as e:
+            self._filters_mtime = _mtime(self.settings["JOB_FILTERS_FILE"])
+            logger.error(f"Rejected config reload from {self.path}, keeping the running config: {str(e)}")
+            return False
+
+        changed = sorted(key for key in settings if settings[key] != self.settings[key])
+        restart_only = sorted(
+            key for key in file_values.keys() | self._file_values.keys()
+            if key not in RELOADABLE_SETTINGS and file_values.get(key) != self._file_values.get(key)
+        )
+
+        # Everything below runs without an await, so a cycle never sees half of it
+        self.scraper.apply_settings(settings, job_filter)
+        replaced = []
+        if channels is not None:
+            replaced = manager.apply_settings(channels, settings["TELEGRAM_BOT_TOKEN"], settings["TELEGRAM_CHAT_ID"])
+        self.settings = settings
+        self._file_values = file_values
+        self._filters_mtime = filters_mtime
+
+        if changed or job_filter is not None:
+            logger.info(
+                f"Applied config reload: changed {changed or 'nothing'}"
+                + (f", reloaded job filters from {filters_path}" if job_filter is not None else "")
+            )
+        if restart_only:
+            logger.warning(f"Config changes to {restart_only} only take effect after a restart")
+        await manager.close_channels(replaced)
+        return True
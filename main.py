@@ -1,34 +1,80 @@
+import argparse
 import asyncio
 import signal
 import sys
-from scraper import LSPScraper
 
 async def send_test_notification():
     """Send a test notification to verify the notification system"""
-    scraper = LSPScraper()
-    await scraper.notification_manager.send_telegram("This is a test notification from LSP Job Notifier")
-    await scraper.cleanup()
+    # Only the notification layer is needed here - no browser, scraper or log file
+    from notifications import NotificationManager
+    notification_manager = NotificationManager()
+    try:
+        sent = await notification_manager.notify(
+            "LSP Job Notifier", "This is a test notification from LSP Job Notifier"
+        )
+    finally:
+        await notification_manager.close()
+    for name, state in notification_manager.channel_stats().items():
+        print(f"  {name}: {'failed' if state['consecutive_failures'] else 'sent'}")
+    return 0 if sent else 1
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="LSP Job Notifier")
+    parser.add_argument('--test-notification', action='store_true',
+                        help="send a test message through every notification channel and exit")
+    parser.add_argument('--record', action='store_true',
+                        help="record every cycle for offline replay (see replay.py)")
+    parser.add_argument('--profile', type=int, metavar='N',
+                        help="run N cycles under cProfile/tracemalloc, write reports and exit")
+    parser.add_argument('--once', action='store_true',
+                        help="run a single check with on-disk state and exit with a status code")
+    return parser.parse_args()
+
+async def run_once(record: bool) -> int:
+    """Single quiet check for cron/systemd timers."""
+    from scraper import LSPScraper
+    scraper = LSPScraper(record_cycles=record)
+    # Let SIGINT/SIGTERM unwind through run_once so the browser is still closed and state saved
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        return await scraper.run_once()
+    except KeyboardInterrupt:
+        return 130
 
 async def main():
-    # Check command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--test-notification':
-            print("Sending test notification...")
-            await send_test_notification()
-            return
+    args = parse_args()
+    if args.test_notification:
+        print("Sending test notification...")
+        return await send_test_notification()
+    
+    if args.once:
+        return await run_once(args.record)
         
-    scraper = LSPScraper()
+    from scraper import LSPScraper
+    scraper = LSPScraper(record_cycles=True) if args.record else LSPScraper()
+    
+    if args.profile:
+        from profiler import CycleProfiler
+        scraper.profiler = CycleProfiler()
     
-    # Handle graceful shutdown
+    # Graceful shutdown: run() returns once the current cycle is finished or
+    # cancelled, and cleanup() below runs exactly once
     def signal_handler(sig, frame):
-        print("\nShutting down gracefully...")
-        asyncio.create_task(scraper.cleanup())
-        sys.exit(0)
+        if not scraper.stopping:
+            print("\nShutting down gracefully...")
+        scraper.handle_signal(sig, frame)
 
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
+        if scraper.profiler:
+            print(f"Profiling {args.profile} cycles, writing reports to {scraper.profiler.output_dir}")
+            await scraper.run(max_cycles=args.profile)
+            print(f"Profile summary written to {scraper.profiler.write_summary()}")
+            return
+        
         # Start the monitoring in quiet mode
         print("LSP Job Notifier started. Running in background mode with minimal output.")
         print("Press Ctrl+C to stop.")
@@ -39,4 +85,4 @@ async def main():
         await scraper.cleanup()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,52 @@
+"""Notification texts for new jobs and auto-claim attempts.
+
+Messages are Telegram HTML (see channels.plain_text for the other channels),
+so every value taken from a job is escaped: one "&" or "<" in an address or
+request description would make Telegram reject the whole message.
+"""
+import html
+from typing import Dict, Tuple
+
+
+def _value(job: Dict, key: str) -> str:
+    return html.escape(str(job.get(key) or ""))
+
+
+def job_message(job: Dict) -> Tuple[str, str]:
+    """(subject, HTML message) announcing a new job."""
+    subject = f"New Job Available: {job.get('client_name') or ''}"
+    message = (
+        f"<b>Client:</b> {_value(job, 'client_name')}\n"
+        f"<b>Time:</b> {_value(job, 'appointment_time')}\n"
+        f"<b>Duration:</b> {_value(job, 'duration')}\n"
+        f"<b>Location:</b> {_value(job, 'location')}\n"
+    )
+    if job.get("distance"):
+        message += f"<b>Distance:</b> {_value(job, 'distance')} mi\n"
+    if job.get("nearest_base"):
+        message += f"<b>Nearest base:</b> {_value(job, 'nearest_base')} ({_value(job, 'nearest_base_miles')} mi)\n"
+    if job.get("request_description"):
+        message += f"<b>Request:</b> {_value(job, 'request_description')}\n"
+    if job.get("conflicts_with"):
+        message += f"<b>Conflicts with:</b> {html.escape(', '.join(job['conflicts_with']))}\n"
+    message += f"\n<b>Job ID:</b> {_value(job, 'id')}"
+    return subject, message
+
+
+def claim_message(result, mode: str) -> Tuple[str, str]:
+    """(subject, HTML message) reporting one auto-claim attempt (a claim.ClaimResult)."""
+    job = result.job
+    outcome = "Claimed" if result.success else "Claim FAILED"
+    if mode == "dry-run":
+        outcome += " (dry run)"
+    latency = f"{result.total_ms:.0f} ms from detection, " if result.total_ms else ""
+    message = (
+        f"<b>Client:</b> {_value(job, 'client_name')}\n"
+        f"<b>Time:</b> {_value(job, 'appointment_time')}\n"
+        f"<b>Duration:</b> {_value(job, 'duration')}\n"
+        f"<b>Location:</b> {_value(job, 'location')}\n"
+        f"<b>Result:</b> {result.status or 'no response'} {html.escape(result.detail)}\n"
+        f"<b>Latency:</b> {latency}{result.request_ms:.0f} ms request\n\n"
+        f"<b>Job ID:</b> {_value(job, 'id')}"
+    )
+    return f"{outcome}: {job.get('client_name') or ''}", message
@@ -1,30 +1,60 @@
-import telegram
+import asyncio
 import logging
 import os
-import requests
 import traceback
 import json
 from config import (
     TELEGRAM_BOT_TOKEN,
-    TELEGRAM_CHAT_ID
+    TELEGRAM_CHAT_ID,
+    CHANNEL_TIMEOUT
 )
+from channels import build_channels, channel_stats
 
 class NotificationManager:
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self.telegram_bot = None
+        self.logger = logging.getLogger('LSPScraper.notifications')
+        self._telegram_bot = None
+        self._telegram_bot_initialized = False
+        self._session = None
+        self.bot_token = TELEGRAM_BOT_TOKEN
+        self.chat_id = TELEGRAM_CHAT_ID
+        self.channels = build_channels(self)
         
-        # Initialize Telegram bot if configured
-        if TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID:
-            self.logger.info(f"Initializing Telegram bot with token: {TELEGRAM_BOT_TOKEN[:4]}...{TELEGRAM_BOT_TOKEN[-4:]} and chat ID: {TELEGRAM_CHAT_ID}")
-            try:
-                self.telegram_bot = telegram.Bot(token=TELEGRAM_BOT_TOKEN)
-                self.logger.info("Telegram bot initialized successfully")
-            except Exception as e:
-                self.logger.error(f"Failed to initialize Telegram bot: {str(e)}")
-                self.logger.error(f"Detailed error: {traceback.format_exc()}")
-        else:
-            self.logger.warning(f"Telegram not configured properly. Token present: {bool(TELEGRAM_BOT_TOKEN)}, Chat ID present: {bool(TELEGRAM_CHAT_ID)}")
+        if self.has_channel("telegram") and not (self.bot_token and self.chat_id):
+            self.logger.warning(f"Telegram not configured properly. Token present: {bool(self.bot_token)}, Chat ID present: {bool(self.chat_id)}")
+
+    @property
+    def telegram_bot(self):
+        """Telegram bot, created (and python-telegram-bot imported) on first use."""
+        if not self._telegram_bot_initialized:
+            self._telegram_bot_initialized = True
+            if self.bot_token and self.chat_id:
+                self.logger.info(f"Initializing Telegram bot with token: {self.bot_token[:4]}...{self.bot_token[-4:]} and chat ID: {self.chat_id}")
+                try:
+                    import telegram
+                    self._telegram_bot = telegram.Bot(token=self.bot_token)
+                    self.logger.info("Telegram bot initialized successfully")
+                except Exception as e:
+                    self.logger.error(f"Failed to initialize Telegram bot: {str(e)}")
+                    self.logger.error(f"Detailed error: {traceback.format_exc()}")
+        return self._telegram_bot
+
+    def has_channel(self, name):
+        return any(channel.name == name for channel in self.channels)
+
+    async def verify_channels(self):
+        """Log the configured channels and check the ones that can be checked without sending.
+
+        Only Telegram can (its bot token is verified); the others are only
+        known to work once a notification has gone through them.
+        """
+        if not self.channels:
+            self.logger.error("No notification channels configured")
+            return False
+        self.logger.info(f"Notification channels: {', '.join(channel.name for channel in self.channels)}")
+        if self.has_channel("telegram"):
+            return await self.verify_telegram_bot()
+        return True
 
     async def verify_telegram_bot(self):
         """Test Telegram bot by getting bot information"""
@@ -47,12 +77,12 @@ class NotificationManager:
         # First try with python-telegram-bot
         if self.telegram_bot:
             try:
-                self.logger.info(f"Attempting to send Telegram message to chat ID: {TELEGRAM_CHAT_ID}")
+                self.logger.info(f"Attempting to send Telegram message to chat ID: {self.chat_id}")
                 # Check if message contains HTML tags
                 if '<' in message and '>' in message:
                     self.logger.info("Sending message with HTML parsing")
                     await self.telegram_bot.send_message(
-                        chat_id=TELEGRAM_CHAT_ID,
+                        chat_id=self.chat_id,
                         text=message,
                         parse_mode='HTML'
                     )
@@ -60,7 +90,7 @@ class NotificationManager:
                     # For plain text messages, don't specify parse_mode
                     self.logger.info("Sending plain text message")
                     await self.telegram_bot.send_message(
-                        chat_id=TELEGRAM_CHAT_ID,
+                        chat_id=self.chat_id,
                         text=message
                     )
                 self.logger.info("Telegram message sent successfully via python-telegram-bot")
@@ -73,10 +103,14 @@ class NotificationManager:
             
         # Fallback to direct API call if python-telegram-bot fails
         try:
+            import aiohttp
+            if self._session is None:
+                # Kept open so fallback sends reuse the connection to api.telegram.org
+                self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=CHANNEL_TIMEOUT or None))
             self.logger.info("Attempting to send message via direct API call")
-            url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
             payload = {
-                "chat_id": TELEGRAM_CHAT_ID,
+                "chat_id": self.chat_id,
                 "text": message,
                 "parse_mode": "HTML" if ('<' in message and '>' in message) else None
             }
@@ -86,23 +120,79 @@ class NotificationManager:
             self.logger.info(f"API URL: {url}")
             self.logger.info(f"Payload: {json.dumps(payload)}")
             
-            response = requests.post(url, json=payload, timeout=10)
-            self.logger.info(f"Direct API response status: {response.status_code}")
-            self.logger.info(f"Direct API response: {response.text}")
+            async with self._session.post(url, json=payload) as response:
+                response_text = await response.text()
+            self.logger.info(f"Direct API response status: {response.status}")
+            self.logger.info(f"Direct API response: {response_text}")
             
-            if response.status_code == 200:
+            if response.status == 200:
                 self.logger.info("Telegram message sent successfully via direct API")
                 return True
             else:
-                self.logger.error(f"Failed to send via direct API. Status: {response.status_code}")
+                self.logger.error(f"Failed to send via direct API. Status: {response.status}")
                 return False
         except Exception as e:
             self.logger.error(f"Failed to send via direct API: {str(e)}")
             self.logger.error(f"Detailed error: {traceback.format_exc()}")
             return False
 
-    async def notify(self, subject, message):
-        """Send notifications through Telegram."""
-        # Format message with HTML for subject
-        formatted_message = f"<b>{subject}</b>\n\n{message}" if '<' in message else f"{subject}\n\n{message}"
-        return await self.send_telegram(formatted_message) 
\ No newline at end of file
+    async def notify(self, subject, message, pending=None):
+        """Send a notification through every configured channel at once.
+
+        Returns True when at least one delivering channel accepted it. A slow
+        or dead channel only costs its own timeout, never the others'.
+
+        pending, a set of channel names, limits the send to those channels and
+        drops the ones that accept, so a retry with the same set never sends
+        the message twice through one channel.
+        """
+        channels = [channel for channel in self.channels if pending is None or channel.name in pending]
+        if not channels:
+            self.logger.error("No notification channels configured")
+            return False
+        results = await asyncio.gather(*(channel.send(subject, message) for channel in channels))
+        for channel, sent in zip(channels, results):
+            if sent and pending is not None:
+                pending.discard(channel.name)
+            elif not sent:
+                self.logger.warning(f"Notification not delivered via {channel.name}")
+        delivering = [sent for channel, sent in zip(channels, results) if channel.delivers]
+        return any(delivering) if delivering else all(results)
+
+    def channel_names(self):
+        """Names of the configured channels, the starting point for notify's pending set."""
+        return {channel.name for channel in self.channels}
+
+    def apply_settings(self, channels, bot_token, chat_id):
+        """Swap in channels built from reloaded settings.
+
+        Runs without awaiting, so no notification sees half of the change.
+        Returns the replaced channels for the caller to close.
+        """
+        if (bot_token, chat_id) != (self.bot_token, self.chat_id):
+            self.bot_token = bot_token
+            self.chat_id = chat_id
+            # Recreated with the new token on next use
+            self._telegram_bot = None
+            self._telegram_bot_initialized = False
+        replaced = self.channels
+        self.channels = channels
+        return replaced
+
+    async def close_channels(self, channels):
+        for channel in channels:
+            try:
+                await channel.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing {channel.name} channel: {str(e)}")
+
+    def channel_stats(self):
+        """Circuit breaker state of every channel."""
+        return channel_stats(self.channels)
+
+    async def close(self):
+        """Close every channel's connections."""
+        await self.close_channels(self.channels)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None 
\ No newline at end of file
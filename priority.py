@@ -0,0 +1,104 @@
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from columns import iso_timestamp, parse_datetime
+from config import (
+    PRIORITY_WEIGHTS,
+    URGENCY_HALF_LIFE_HOURS,
+    DISTANCE_HALF_LIFE_MILES,
+    LONG_JOB_MINUTES
+)
+
+logger = logging.getLogger('LSPScraper.priority')
+
+# Score given to a component when the job doesn't say (unknown distance, ...)
+UNKNOWN_COMPONENT = 0.5
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse "urgency=0.6,distance=0.3,duration=0.1" into a weight per component."""
+    weights = {"urgency": 0.0, "distance": 0.0, "duration": 0.0}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in weights:
+            raise ValueError(f"unknown priority component '{name}'")
+        weights[name] = float(value)
+    return weights
+
+
+def configured_weights(spec: str = PRIORITY_WEIGHTS) -> Dict[str, float]:
+    """Weights from a PRIORITY_WEIGHTS setting; invalid settings fall back to grid order."""
+    try:
+        return parse_weights(spec)
+    except ValueError as e:
+        logger.error(f"Ignoring invalid PRIORITY_WEIGHTS '{spec}', notifying in grid order: {str(e)}")
+        return parse_weights("")
+
+
+def _appointment_timestamp(job: Dict) -> Optional[float]:
+    # Both parsers are cached, so a burst of jobs at the same few times is cheap
+    iso_value = job.get("appointment_at")
+    if iso_value is None and job.get("appointment_time"):
+        iso_value = parse_datetime(job["appointment_time"])
+    return iso_timestamp(iso_value)
+
+
+def score_components(job: Dict, now: float) -> Dict[str, float]:
+    """Each component in [0, 1], higher meaning more worth notifying first.
+
+    urgency halves every URGENCY_HALF_LIFE_HOURS until the appointment and is 0
+    once it has started; distance halves every DISTANCE_HALF_LIFE_MILES; duration
+    grows with the job's length up to LONG_JOB_MINUTES.
+    """
+    start = _appointment_timestamp(job)
+    if start is None:
+        urgency = UNKNOWN_COMPONENT
+    elif start <= now:
+        urgency = 0.0
+    else:
+        urgency = 0.5 ** ((start - now) / 3600 / URGENCY_HALF_LIFE_HOURS)
+
+    # Distance to the nearest home base when HOME_BASES is set, else the portal's figure
+    miles = job.get("nearest_base_miles", job.get("distance_miles"))
+    distance = UNKNOWN_COMPONENT if miles is None else 0.5 ** (max(miles, 0) / DISTANCE_HALF_LIFE_MILES)
+
+    minutes = job.get("duration_minutes")
+    duration = UNKNOWN_COMPONENT if not minutes else min(minutes, LONG_JOB_MINUTES) / LONG_JOB_MINUTES
+
+    return {"urgency": urgency, "distance": distance, "duration": duration}
+
+
+class NotificationQueue:
+    """Max-priority queue of jobs waiting to be notified.
+
+    Ties keep the order the jobs were pushed in, so with equal scores
+    notifications still follow the grid.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self._heap: List[Tuple[float, int, Dict]] = []
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def score(self, job: Dict, now: Optional[float] = None) -> float:
+        components = score_components(job, now if now is not None else time.time())
+        return sum(self.weights[name] * value for name, value in components.items())
+
+    def push(self, jobs: Iterable[Dict], now: Optional[float] = None):
+        now = now if now is not None else time.time()
+        for job in jobs:
+            score = self.score(job, now)
+            job["priority"] = round(score, 3)
+            heapq.heappush(self._heap, (-score, next(self._counter), job))
+
+    def pop(self) -> Dict:
+        return heapq.heappop(self._heap)[2]
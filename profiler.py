@@ -0,0 +1,153 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import PROFILE_DIR
+
+try:
+    import psutil
+except ImportError:  # Optional: only needed to measure resident set sizes
+    psutil = None
+
+# Number of consecutive increases in RSS before we call it a leak
+GROWTH_WINDOW = 3
+TOP_STATS = 25
+
+
+class CycleProfiler:
+    """Profile scrape cycles phase by phase and track memory between cycles.
+
+    Each phase of each cycle gets its own cProfile dump, tracemalloc snapshots
+    are diffed between consecutive cycles, and the resident set of this process
+    and of the Chrome processes spawned by the driver is sampled after every
+    cycle so slow creep over many cycles shows up as monotonic growth.
+    """
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.logger = logging.getLogger('LSPScraper.profiler')
+        self.output_dir = output_dir or os.path.join(
+            PROFILE_DIR, datetime.now().strftime('%Y%m%d-%H%M%S')
+        )
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.cycle = 0
+        self.phase_stats: Dict[str, pstats.Stats] = {}
+        self.rss_history: List[Dict[str, int]] = []
+        self._previous_snapshot = None
+
+        if psutil is None:
+            self.logger.warning("psutil not installed, resident set sizes will not be tracked")
+
+        tracemalloc.start(25)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Profile the enclosed block as one phase of the current cycle."""
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            path = os.path.join(self.output_dir, f"cycle-{self.cycle:03d}-{name}.prof")
+            profile.dump_stats(path)
+            if name in self.phase_stats:
+                self.phase_stats[name].add(path)
+            else:
+                self.phase_stats[name] = pstats.Stats(path)
+
+    def end_cycle(self, driver=None):
+        """Snapshot memory at the end of a cycle and diff it against the last one."""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if self._previous_snapshot is not None:
+            top_stats = snapshot.compare_to(self._previous_snapshot, 'lineno')
+            path = os.path.join(self.output_dir, f"cycle-{self.cycle:03d}-alloc-diff.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"Top {TOP_STATS} allocation changes since cycle {self.cycle - 1}\n\n")
+                for stat in top_stats[:TOP_STATS]:
+                    f.write(f"{stat}\n")
+        self._previous_snapshot = snapshot
+
+        rss = self._sample_rss(driver)
+        if rss:
+            self.rss_history.append(rss)
+            self.logger.info(
+                f"Cycle {self.cycle} RSS: python={rss['python'] / 2**20:.1f} MiB, "
+                f"chrome={rss['chrome'] / 2**20:.1f} MiB"
+            )
+
+        self.cycle += 1
+
+    def _sample_rss(self, driver) -> Optional[Dict[str, int]]:
+        """Return the resident set of this process and of the browser's process tree."""
+        if psutil is None:
+            return None
+
+        sample = {"python": psutil.Process().memory_info().rss, "chrome": 0}
+        try:
+            # chromedriver is our child; Chrome and its renderers hang off it
+            service_process = driver.service.process if driver else None
+            if service_process:
+                root = psutil.Process(service_process.pid)
+                for process in [root] + root.children(recursive=True):
+                    try:
+                        sample["chrome"] += process.memory_info().rss
+                    except psutil.Error:
+                        continue
+        except Exception as e:
+            self.logger.warning(f"Could not measure Chrome memory: {str(e)}")
+        return sample
+
+    def growth_warnings(self) -> List[str]:
+        """Describe every process group whose RSS grew in each of the last cycles."""
+        warnings = []
+        if len(self.rss_history) <= GROWTH_WINDOW:
+            return warnings
+
+        for key in ("python", "chrome"):
+            recent = [sample[key] for sample in self.rss_history[-(GROWTH_WINDOW + 1):]]
+            if all(later > earlier for earlier, later in zip(recent, recent[1:])):
+                warnings.append(
+                    f"{key} RSS grew for {GROWTH_WINDOW} consecutive cycles: "
+                    + " -> ".join(f"{value / 2**20:.1f}" for value in recent) + " MiB"
+                )
+        return warnings
+
+    def write_summary(self) -> str:
+        """Write the aggregated per-phase profiles and memory history, returning the path."""
+        path = os.path.join(self.output_dir, "summary.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Profiled {self.cycle} cycles\n\n")
+
+            for name, stats in self.phase_stats.items():
+                stats.dump_stats(os.path.join(self.output_dir, f"all-{name}.prof"))
+                buffer = io.StringIO()
+                stats.stream = buffer
+                stats.sort_stats('cumulative').print_stats(TOP_STATS)
+                f.write(f"=== Phase: {name} ===\n{buffer.getvalue()}\n")
+
+            if self.rss_history:
+                f.write("=== Resident set (MiB) ===\n")
+                f.write(f"{'cycle':>6} {'python':>10} {'chrome':>10}\n")
+                for cycle, sample in enumerate(self.rss_history):
+                    f.write(f"{cycle:>6} {sample['python'] / 2**20:>10.1f} "
+                            f"{sample['chrome'] / 2**20:>10.1f}\n")
+
+            warnings = self.growth_warnings()
+            f.write("\n=== Growth ===\n")
+            f.write("\n".join(warnings) if warnings else "No monotonic growth detected")
+            f.write("\n")
+
+        for warning in warnings:
+            self.logger.warning(warning)
+        tracemalloc.stop()
+        return path
@@ -0,0 +1,130 @@
+import glob
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import RECORDINGS_DIR, MAX_RECORDINGS
+
+# Resource types whose bodies are worth keeping; images, fonts and scripts
+# only bloat the archive and are never looked at by the extraction pipeline.
+RECORDED_RESOURCE_TYPES = ("XHR", "Fetch", "Document")
+
+RECORDING_VERSION = 1
+
+
+def enable_network_capture(chrome_options):
+    """Ask Chrome to expose its DevTools network events through the performance log."""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+class CycleRecorder:
+    """Capture each scrape cycle's network responses and final DOM to disk.
+
+    Every cycle becomes one gzip-compressed JSON file in ``directory`` that the
+    replay driver (``replay.py``) can feed back through the extraction and diff
+    pipeline without a browser.
+    """
+
+    def __init__(self, directory: str = RECORDINGS_DIR, max_files: int = MAX_RECORDINGS):
+        self.logger = logging.getLogger('LSPScraper.recorder')
+        self.directory = directory
+        self.max_files = max_files
+        os.makedirs(self.directory, exist_ok=True)
+
+    def capture(self, driver, seen_before: List, jobs: List[Dict], new_jobs: List[Dict]) -> Optional[str]:
+        """Write the current cycle to the archive and return its path."""
+        try:
+            recorded_at = datetime.now()
+            recording = {
+                "version": RECORDING_VERSION,
+                "recorded_at": recorded_at.isoformat(),
+                "url": driver.current_url,
+                "responses": self._collect_network_responses(driver),
+                "dom": driver.page_source,
+                "seen_before": sorted(str(job_id) for job_id in seen_before),
+                "jobs": jobs,
+                "new_job_ids": [job["id"] for job in new_jobs],
+            }
+
+            path = os.path.join(
+                self.directory,
+                f"cycle-{recorded_at.strftime('%Y%m%d-%H%M%S-%f')}.json.gz"
+            )
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                json.dump(recording, f, separators=(",", ":"))
+            self.logger.info(f"Recorded cycle to {path}")
+
+            self._prune()
+            return path
+        except Exception as e:
+            self.logger.error(f"Failed to record cycle: {str(e)}")
+            return None
+
+    def _collect_network_responses(self, driver) -> List[Dict]:
+        """Drain the performance log and fetch bodies for the interesting responses."""
+        responses = []
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            self.logger.warning(f"Performance log not available, recording DOM only: {str(e)}")
+            return responses
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+                if message.get("method") != "Network.responseReceived":
+                    continue
+
+                params = message["params"]
+                if params.get("type") not in RECORDED_RESOURCE_TYPES:
+                    continue
+
+                response = params["response"]
+                record = {
+                    "url": response.get("url"),
+                    "status": response.get("status"),
+                    "mime_type": response.get("mimeType"),
+                    "headers": response.get("headers", {}),
+                    "body": None,
+                }
+                try:
+                    body = driver.execute_cdp_cmd(
+                        'Network.getResponseBody', {'requestId': params["requestId"]}
+                    )
+                    # Binary bodies come back base64 encoded; keep them as-is
+                    record["body"] = body.get("body")
+                    record["base64_encoded"] = body.get("base64Encoded", False)
+                except Exception:
+                    # Bodies are evicted from Chrome's buffer once the page moves on
+                    pass
+                responses.append(record)
+            except Exception as e:
+                self.logger.warning(f"Skipping malformed performance log entry: {str(e)}")
+
+        return responses
+
+    def _prune(self):
+        """Keep only the newest max_files recordings."""
+        recordings = list_recordings(self.directory)
+        for path in recordings[:-self.max_files] if self.max_files > 0 else []:
+            try:
+                os.remove(path)
+            except Exception as e:
+                self.logger.warning(f"Failed to remove old recording {path}: {str(e)}")
+
+
+def list_recordings(path: str) -> List[str]:
+    """Return recording files under path (or path itself), oldest first."""
+    if os.path.isdir(path):
+        # File names embed the capture timestamp, so lexical order is chronological
+        return sorted(glob.glob(os.path.join(path, "cycle-*.json.gz")))
+    return [path]
+
+
+def load_recording(path: str) -> Dict:
+    """Load a single recorded cycle."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
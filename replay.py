@@ -0,0 +1,216 @@
+"""Replay recorded scrape cycles through the extraction and diff pipeline.
+
+Usage:
+    python replay.py [recordings_dir_or_file ...] [--verify] [--repeat N]
+
+No browser or network access is needed: each recording's DOM snapshot is parsed
+with BeautifulSoup and pushed through the same JobExtractor the live scraper
+uses, with every stage timed. With --verify the run fails when the replayed
+jobs differ from what was extracted live, which turns a directory of production
+recordings into an offline regression suite.
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from bs4 import BeautifulSoup, CData, NavigableString
+
+from extraction import JobExtractor, normalize_job_format, GRID_SELECTOR
+from filters import JobFilter
+from recorder import list_recordings, load_recording
+from config import RECORDINGS_DIR, JOB_FILTERS_FILE
+
+STAGES = ("load", "parse", "extract", "normalize", "diff", "filter")
+
+# Never rendered, so never part of a WebElement's .text
+UNRENDERED_TAGS = frozenset(("script", "style", "template", "noscript", "head"))
+
+
+def _inline_style(tag) -> Dict[str, str]:
+    declarations = {}
+    for declaration in (tag.get("style") or "").split(";"):
+        name, _, value = declaration.partition(":")
+        if value:
+            declarations[name.strip().lower()] = value.strip().lower()
+    return declarations
+
+
+def _is_displayed(tag) -> bool:
+    """False when the tag itself is display:none, i.e. its whole subtree is hidden.
+
+    Only what a page snapshot carries is known: the hidden attribute (how
+    Angular hides the inactive portal tabs), inline styles and ag-grid's
+    ag-hidden class. Stylesheets are not evaluated.
+    """
+    if tag.name in UNRENDERED_TAGS or tag.has_attr("hidden"):
+        return False
+    if "ag-hidden" in (tag.get("class") or []):
+        return False
+    return _inline_style(tag).get("display") != "none"
+
+
+def _visibility(tag, inherited: bool) -> bool:
+    """Whether the tag's own text shows; visibility is inherited but can be overridden."""
+    value = _inline_style(tag).get("visibility")
+    if value in ("hidden", "collapse"):
+        return False
+    if value == "visible":
+        return True
+    return inherited
+
+
+class HtmlElement:
+    """Minimal WebElement look-alike backed by a BeautifulSoup tag."""
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    @property
+    def text(self) -> str:
+        """Visible text only, like Selenium's WebElement.text."""
+        visible = True
+        for tag in reversed([self.tag] + list(self.tag.parents)):
+            if tag.name is None or tag.name == "[document]":
+                continue
+            if not _is_displayed(tag):
+                return ""
+            visible = _visibility(tag, visible)
+        return "\n".join(self._visible_strings(self.tag, visible))
+
+    def _visible_strings(self, tag, visible: bool):
+        for child in tag.children:
+            if type(child) in (NavigableString, CData):
+                text = child.strip()
+                if text and visible:
+                    yield text
+            elif getattr(child, "name", None) and _is_displayed(child):
+                yield from self._visible_strings(child, _visibility(child, visible))
+
+    def get_attribute(self, name):
+        value = self.tag.get(name)
+        if isinstance(value, list):
+            # bs4 splits multi-valued attributes such as class
+            return " ".join(value)
+        return value
+
+    def find_elements(self, by, selector) -> List["HtmlElement"]:
+        return [HtmlElement(tag) for tag in self.tag.select(selector)]
+
+
+def replay_cycle(recording_path: str, extractor: JobExtractor, job_filter: JobFilter) -> Dict:
+    """Replay one recording and return its per-stage timings and results."""
+    timings = {}
+
+    start = time.perf_counter()
+    recording = load_recording(recording_path)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    soup = BeautifulSoup(recording["dom"], "html.parser")
+    grids = HtmlElement(soup).find_elements(None, GRID_SELECTOR)
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jobs = extractor.extract_jobs(grids)
+    timings["extract"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    normalized = [normalize_job_format(job) for job in jobs]
+    timings["normalize"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    seen_jobs = set(recording.get("seen_before", []))
+    new_jobs = extractor.diff_jobs(jobs, seen_jobs)
+    timings["diff"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    notified = job_filter.apply([normalize_job_format(job) for job in new_jobs])
+    timings["filter"] = time.perf_counter() - start
+
+    return {
+        "path": recording_path,
+        "timings": timings,
+        "recording": recording,
+        "jobs": jobs,
+        "normalized": normalized,
+        "new_job_ids": [job["id"] for job in new_jobs],
+        "notified_job_ids": [job["id"] for job in notified],
+    }
+
+
+def verify_cycle(result: Dict) -> List[str]:
+    """Compare a replayed cycle against what the live scraper extracted."""
+    problems = []
+    recording = result["recording"]
+    if result["jobs"] != recording.get("jobs", []):
+        problems.append(
+            f"extracted {len(result['jobs'])} jobs, recording has {len(recording.get('jobs', []))} "
+            f"(or their fields differ)"
+        )
+    if result["new_job_ids"] != recording.get("new_job_ids", []):
+        problems.append(
+            f"new jobs {result['new_job_ids']} != recorded {recording.get('new_job_ids', [])}"
+        )
+    return problems
+
+
+def print_report(results: List[Dict], repeat: int):
+    """Print per-stage timing statistics across all replayed cycles."""
+    print(f"Replayed {len(results) // repeat} cycles x {repeat}")
+    print(f"{'stage':<10} {'min ms':>10} {'median ms':>10} {'max ms':>10} {'total ms':>10}")
+    for stage in STAGES:
+        samples = [r["timings"][stage] * 1000 for r in results]
+        print(f"{stage:<10} {min(samples):>10.2f} {statistics.median(samples):>10.2f} "
+              f"{max(samples):>10.2f} {sum(samples):>10.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded LSP scrape cycles offline")
+    parser.add_argument("paths", nargs="*", default=[RECORDINGS_DIR],
+                        help="recording files or directories (default: %(default)s)")
+    parser.add_argument("--verify", action="store_true",
+                        help="fail if replayed jobs differ from the recorded ones")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="replay every cycle N times for steadier timings")
+    parser.add_argument("--filters", default=JOB_FILTERS_FILE,
+                        help="job filter rules to replay against (default: %(default)s)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="show the extractor's per-row logging")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    extractor = JobExtractor(logging.getLogger("replay"))
+    job_filter = JobFilter.from_file(args.filters)
+
+    paths = [p for path in args.paths for p in list_recordings(path)]
+    if not paths:
+        print("No recordings found")
+        return 1
+
+    results = []
+    failures = 0
+    for path in paths:
+        for _ in range(args.repeat):
+            result = replay_cycle(path, extractor, job_filter)
+            results.append(result)
+        if args.verify:
+            problems = verify_cycle(result)
+            if problems:
+                failures += 1
+                for problem in problems:
+                    print(f"MISMATCH {path}: {problem}")
+
+    print_report(results, args.repeat)
+    if job_filter.rules:
+        stats = job_filter.stats()
+        print(f"Filter kept {stats['passed']} of {stats['evaluated']} new jobs; rule hits: {stats['rule_hits']}")
+    if args.verify:
+        print(f"Verified {len(paths)} cycles, {failures} mismatched")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
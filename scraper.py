@@ -4,17 +4,10 @@ import time
 import asyncio
 import os
 import glob
+import signal
 from typing import Dict, List, Optional
-import aiohttp
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import traceback
+from contextlib import nullcontext
 from logging.handlers import RotatingFileHandler
 
 from config import (
@@ -27,24 +20,111 @@ from config import (
     LOG_FILE,
     MAX_DATA_FILES,
     MAX_SCREENSHOT_FILES,
-    CLEANUP_OLD_FILES
+    CLEANUP_OLD_FILES,
+    SAVE_DEBUG_FILES,
+    RECORD_CYCLES,
+    CHECK_INTERVAL,
+    CYCLE_DEADLINE,
+    LOGIN_TIMEOUT,
+    CHECK_TIMEOUT,
+    NOTIFY_TIMEOUT,
+    PAGE_LOAD_TIMEOUT,
+    SHUTDOWN_TIMEOUT,
+    FAILURE_THRESHOLD,
+    FAILURE_BACKOFF,
+    MAX_FAILURE_BACKOFF,
+    SCHEDULE_CONFLICTS,
+    TRAVEL_BUFFER_MINUTES,
+    DEFAULT_JOB_MINUTES,
+    JOB_HISTORY,
+    HOME_BASES
 )
 from notifications import NotificationManager
+from extraction import (
+    JobExtractor,
+    normalize_job_format,
+    fingerprint,
+    GRID_SELECTOR,
+    ROW_SELECTOR,
+    GRID_CONTENT_SCRIPT,
+    OPEN_JOBS_MARKER_COLUMNS,
+    OPEN_JOBS_VISIBLE_SCRIPT
+)
+from recorder import CycleRecorder, enable_network_capture
+from state import load_seen_jobs, save_seen_jobs
+from deadlines import Watchdog, CircuitBreaker, Heartbeat
+from filters import JobFilter
+from appointments import ScheduleIndex, read_assigned_appointments
+from claim import AutoClaimer
+from history import JobHistory
+from priority import NotificationQueue, configured_weights
+from messages import job_message, claim_message
+from geodistance import GeoDistance
+from live_config import ConfigReloader
+
+# Exit codes for one-shot runs (main.py --once), so timers can tell failures apart
+EXIT_OK = 0
+EXIT_LOGIN_FAILED = 2
+EXIT_CHECK_FAILED = 3
+EXIT_NOTIFY_FAILED = 4
+
+CYCLE_STATUS = {
+    EXIT_OK: "ok",
+    EXIT_LOGIN_FAILED: "login_failed",
+    EXIT_CHECK_FAILED: "check_failed",
+    EXIT_NOTIFY_FAILED: "notify_failed",
+}
 
 class LSPScraper:
-    def __init__(self):
+    def __init__(self, record_cycles: bool = RECORD_CYCLES):
         self.logger = self._setup_logger()
         self.session = None
         self.notification_manager = NotificationManager()
         self.seen_jobs = set()
         self.driver = None
-        if CLEANUP_OLD_FILES:
-            self._clean_old_files()
+        self.extractor = JobExtractor(self.logger)
+        self.recorder = CycleRecorder() if record_cycles else None
+        self.job_filter = JobFilter.from_file()
+        self.schedule = ScheduleIndex([])
+        self.claimer = AutoClaimer()
+        self.history = JobHistory() if JOB_HISTORY else None
+        self.geo = GeoDistance() if HOME_BASES else None
+        self.last_detection_time = None
+        self.profiler = None
+        self.last_check_failed = False
+        self.last_grid_fingerprint = None
+        self.last_jobs = []
+        self.watchdog = Watchdog(on_overrun=self._kill_driver)
+        self.portal_breaker = CircuitBreaker(
+            "portal",
+            failure_threshold=FAILURE_THRESHOLD,
+            base_delay=FAILURE_BACKOFF,
+            max_delay=MAX_FAILURE_BACKOFF
+        )
+        self.heartbeat = Heartbeat()
+        self.check_interval = CHECK_INTERVAL
+        # Parsed once here and on each config reload, not per cycle
+        self.priority_weights = configured_weights()
+        self.reloader = None
+        # Jobs marked seen this cycle whose notification hasn't gone out yet
+        self.unnotified = set()
+        self._saved_seen_jobs = None
+        # Shutdown state, see handle_signal() and request_shutdown()
+        self.stopping = False
+        self.delivering = False
+        self.in_browser = False
+        self._run_task = None
+        self._drain_timer = None
+        self._shutdown_deadline = None
+        self._closed = False
 
     def _setup_logger(self) -> logging.Logger:
         """Set up logging configuration."""
         logger = logging.getLogger('LSPScraper')
         logger.setLevel(LOG_LEVEL)
+        if logger.handlers:
+            # Already configured by an earlier instance in this process
+            return logger
 
         # File handler with rotation to limit file size
         file_handler = RotatingFileHandler(
@@ -68,6 +148,8 @@ class LSPScraper:
     async def _init_session(self):
         """Initialize aiohttp session."""
         if not self.session:
+            # Only imported when a session is actually needed
+            import aiohttp
             self.session = aiohttp.ClientSession(headers=DEFAULT_HEADERS)
 
     async def _close_session(self):
@@ -79,6 +161,17 @@ class LSPScraper:
     def _init_selenium(self):
         """Initialize Selenium WebDriver."""
         if not self.driver:
+            self._start_driver()
+            if self.driver and PAGE_LOAD_TIMEOUT > 0:
+                # Bound every driver.get() so a stalled page can't hang the cycle
+                self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+
+    def _start_driver(self):
+        """Start Chrome, trying a direct launch first and webdriver-manager second."""
+        if not self.driver:
+            # Selenium is only imported once a browser is actually needed
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
             try:
                 self.logger.info("Setting up Chrome WebDriver")
                 chrome_options = Options()
@@ -102,6 +195,10 @@ class LSPScraper:
                 chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
                 chrome_options.add_experimental_option('useAutomationExtension', False)
                 
+                # Expose network responses so cycles can be recorded for replay
+                if self.recorder:
+                    enable_network_capture(chrome_options)
+                
                 # Try direct approach first (works on most modern systems)
                 try:
                     self.logger.info("Initializing Chrome directly")
@@ -180,11 +277,50 @@ class LSPScraper:
     def _close_selenium(self):
         """Close Selenium WebDriver."""
         if self.driver:
-            self.driver.quit()
-            self.driver = None
+            try:
+                self.driver.quit()
+            except Exception as e:
+                # Expected after the watchdog has killed the browser
+                self.logger.warning(f"Error quitting WebDriver: {str(e)}")
+            finally:
+                self.driver = None
+
+    def _kill_driver(self, phase: str):
+        """Hard-kill chromedriver and its browsers. Called from the watchdog thread.
+
+        Whatever Selenium call is blocking the main thread then fails with a
+        connection error instead of hanging; the loop recycles the driver after.
+        """
+        if self._kill_browser():
+            self.logger.error(f"Killed browser after '{phase}' overran")
+
+    def _kill_browser(self) -> bool:
+        """Kill chromedriver and every browser it started; False if none is running."""
+        driver = self.driver
+        process = getattr(getattr(driver, 'service', None), 'process', None) if driver else None
+        if not process:
+            return False
+
+        children = []
+        try:
+            import psutil
+            children = psutil.Process(process.pid).children(recursive=True)
+        except Exception:
+            # Without psutil only chromedriver itself is killed; Chrome exits with it
+            pass
+        for child in children:
+            try:
+                child.kill()
+            except Exception:
+                continue
+        process.kill()
+        return True
 
     async def login(self) -> bool:
         """Log in to the LSP system using Selenium."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
         try:
             self._init_selenium()
             self.logger.info("Initializing browser for login...")
@@ -199,8 +335,9 @@ class LSPScraper:
             self.logger.info(f"Page title: {self.driver.title}")
             
             # Log page source for debugging
-            self.logger.info("Page source preview:")
-            self.logger.info(self.driver.page_source[:500])  # First 500 chars
+            if SAVE_DEBUG_FILES:
+                self.logger.info("Page source preview:")
+                self.logger.info(self.driver.page_source[:500])  # First 500 chars
             
             # Wait for the login form to be present
             self.logger.info("Waiting for login form elements...")
@@ -344,9 +481,9 @@ class LSPScraper:
                     time.sleep(5)  # Wait for portal to load
                     
                     # Save portal page source for debugging
-                    with open("data/portal_after_login.html", "w", encoding="utf-8") as f:
-                        f.write(self.driver.page_source)
-                    self.logger.info("Saved portal page source to data/portal_after_login.html")
+                    if SAVE_DEBUG_FILES:
+                        self._save_page_source("portal_after_login.html")
+                        self.logger.info("Saved portal page source to data/portal_after_login.html")
                     
                     return True
                 except Exception as e:
@@ -396,36 +533,44 @@ class LSPScraper:
             self.logger.error(f"Error extracting job details: {str(e)}")
             return None
 
-    async def process_new_jobs(self, jobs: List[Dict]):
-        """Process and notify about new jobs."""
-        self.logger.info(f"Processing {len(jobs)} new jobs")
+    async def process_new_jobs(self, jobs: List[Dict]) -> List[Dict]:
+        """Process and notify about new jobs.
+
+        Jobs rejected by the job filter are dropped here and stay seen. The
+        rest are notified most urgent first (see priority.py).
+        Returns the jobs whose notification could not be delivered.
+        """
+        # Convert legacy format if needed, then drop the jobs the filter rules reject
+        found = {job["id"] for job in jobs}
+        jobs = self._check_schedule(
+            self.job_filter.apply(self._locate([self._normalize_job_format(job) for job in jobs]))
+        )
+        # Filtered and suppressed jobs are done with; they stay seen
+        self.unnotified -= found - {job["id"] for job in jobs}
+        queue = NotificationQueue(self.priority_weights)
+        queue.push(jobs)
+        self.logger.info(f"Processing {len(queue)} new jobs")
+        failed_jobs = []
         
-        for job in jobs:
-            self.logger.info(f"Processing job: {job}")
-            
-            # Convert legacy format if needed
-            job_data = self._normalize_job_format(job)
+        while queue:
+            job_data = queue.pop()
+            self.logger.info(f"Processing job: {job_data}")
             
             # Create a detailed notification message
-            subject = f"New Job Available: {job_data['client_name']}"
-            
-            message = (
-                f"<b>Client:</b> {job_data['client_name']}\n"
-                f"<b>Time:</b> {job_data['appointment_time']}\n"
-                f"<b>Duration:</b> {job_data['duration']}\n"
-                f"<b>Location:</b> {job_data['location']}\n\n"
-                f"<b>Job ID:</b> {job_data['id']}"
-            )
+            subject, message = job_message(job_data)
             
-            # Try to send notification with extra retry logic
+            # Try to send notification with extra retry logic; a retry only goes to
+            # the channels that have not accepted this job yet
+            pending = self.notification_manager.channel_names()
             max_retries = 3
             for attempt in range(max_retries):
                 try:
                     self.logger.info(f"Sending notification for job (attempt {attempt+1}/{max_retries})")
-                    notification_sent = await self.notification_manager.notify(subject, message)
+                    notification_sent = await self.notification_manager.notify(subject, message, pending)
                     
                     if notification_sent:
                         self.logger.info(f"Notification sent for job: {job_data['id']}")
+                        self.unnotified.discard(job_data["id"])
                         break
                     else:
                         self.logger.warning(f"Failed to send notification, attempt {attempt+1}/{max_retries}")
@@ -437,117 +582,415 @@ class LSPScraper:
                         await asyncio.sleep(2)  # Wait before retry
             else:
                 self.logger.error(f"All attempts to send notification failed for job: {job_data['id']}")
+                failed_jobs.append(job_data)
+        
+        return failed_jobs
     
+    async def _auto_claim(self, new_jobs: List[Dict]) -> List[Dict]:
+        """Claim the jobs matching the accept rules and report each attempt.
+
+        Returns the jobs left for regular notification.
+        """
+        candidates = self.claimer.select(
+            self._check_schedule(self._locate([self._normalize_job_format(job) for job in new_jobs]))
+        )
+        # A conflicting job is flagged, never claimed
+        candidates = [job for job in candidates if not job.get("conflicts_with")]
+        if not candidates:
+            return new_jobs
+
+        await self._init_session()
+        results = await self.claimer.claim(candidates, self.driver, self.session, self.last_detection_time)
+
+        for result in results:
+            subject, message = claim_message(result, self.claimer.mode)
+            try:
+                # Until its report is delivered, a claimed job counts as unnotified
+                if await self.notification_manager.notify(subject, message):
+                    self.unnotified.discard(result.job["id"])
+                else:
+                    self.logger.error(f"Auto-claim notification not delivered for job: {result.job['id']}")
+            except Exception as e:
+                self.logger.error(f"Error sending auto-claim notification: {str(e)}")
+
+        attempted = {result.job["id"] for result in results}
+        return [job for job in new_jobs if job["id"] not in attempted]
+
+    def _refresh_schedule(self):
+        """Rebuild the schedule index from the assigned appointments on the dashboard."""
+        if SCHEDULE_CONFLICTS == "off":
+            return
+        try:
+            appointments = read_assigned_appointments(self.driver, self.extractor.columns)
+            self.schedule = ScheduleIndex(appointments, TRAVEL_BUFFER_MINUTES, DEFAULT_JOB_MINUTES)
+            self.logger.info(f"Loaded {len(self.schedule)} assigned appointments into the schedule index")
+        except Exception as e:
+            # Keep the previous index; assignments rarely change between polls
+            self.logger.warning(f"Could not read assigned appointments: {str(e)}")
+
+    def _check_schedule(self, jobs: List[Dict]) -> List[Dict]:
+        """Flag, or with SCHEDULE_CONFLICTS=suppress drop, jobs that clash with my schedule."""
+        if SCHEDULE_CONFLICTS == "off" or not len(self.schedule):
+            return jobs
+        kept = []
+        for job in jobs:
+            conflicts = self.schedule.conflicts(job)
+            if conflicts:
+                self.logger.info(f"Job {job['id']} conflicts with assigned appointments: {conflicts}")
+                if SCHEDULE_CONFLICTS == "suppress":
+                    continue
+                job["conflicts_with"] = conflicts
+            kept.append(job)
+        return kept
+
+    def _locate(self, jobs: List[Dict]) -> List[Dict]:
+        """Add distances to the home bases (HOME_BASES) to jobs with a known ZIP code."""
+        if self.geo is None:
+            return jobs
+        try:
+            return self.geo.annotate(jobs)
+        except Exception as e:
+            self.logger.warning(f"Could not compute distances to home bases: {str(e)}")
+            return jobs
+
     def _normalize_job_format(self, job):
         """Normalize job data from different formats to a standard format"""
-        # Initialize with default empty values
-        normalized_job = {
-            "id": "",
-            "client_name": "",
-            "appointment_time": "",
-            "duration": "",
-            "location": "",
-            "description": ""
-        }
-        
-        # Check what format the job data is in and convert appropriately
-        if isinstance(job, dict):
-            # If job already has the expected keys, use them directly
-            for key in normalized_job:
-                if key in job:
-                    normalized_job[key] = job[key]
-            
-            # Handle legacy format with different key names
-            if "client" in job and not normalized_job["client_name"]:
-                normalized_job["client_name"] = job["client"]
-            
-            if "title" in job:
-                if not normalized_job["description"]:
-                    normalized_job["description"] = job["title"]
-            
-            if "date" in job and not normalized_job["appointment_time"]:
-                normalized_job["appointment_time"] = job["date"]
-                
-            # Ensure we have an ID
-            if not normalized_job["id"] and "id" in job:
-                normalized_job["id"] = job["id"]
-            elif not normalized_job["id"]:
-                # Generate a random ID if none exists
-                import random
-                normalized_job["id"] = f"job-{random.randint(1000, 9999)}"
-        
-        # Ensure we have at least basic info for the notification
-        if not normalized_job["client_name"]:
-            normalized_job["client_name"] = "Unknown Client"
-            
-        if not normalized_job["description"]:
-            normalized_job["description"] = "Job details not available"
-        
-        return normalized_job
+        return normalize_job_format(job)
+
+    def _phase(self, name: str):
+        """Context manager marking one phase of a cycle for the profiler, if any."""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
+    async def _run_cycle(self) -> int:
+        """Log in, check for jobs and notify once, under the watchdog's deadlines.
+
+        Returns one of the EXIT_* codes. Jobs whose notification failed are
+        removed from seen_jobs so the next cycle retries them.
+        """
+        with self.watchdog.guard("cycle", CYCLE_DEADLINE):
+            # Login
+            self.in_browser = True
+            try:
+                with self._phase("login"), self.watchdog.guard("login", LOGIN_TIMEOUT):
+                    logged_in = await self.login()
+                if not logged_in:
+                    self.logger.error("Failed to login")
+                    return EXIT_LOGIN_FAILED
+
+                # Check for new jobs using the direct DOM navigation approach
+                self.logger.info("Checking for new jobs...")
+                with self._phase("check_jobs"), self.watchdog.guard("check_jobs", CHECK_TIMEOUT):
+                    new_jobs = await self.check_jobs_direct()
+            finally:
+                self.in_browser = False
+            if self.last_check_failed:
+                return EXIT_CHECK_FAILED
+
+            if not new_jobs:
+                self.logger.info("No new jobs found")
+                return EXIT_OK
+
+            self.logger.info(f"Found {len(new_jobs)} new jobs")
+            self.unnotified = {job["id"] for job in new_jobs}
+            found_jobs = new_jobs
+            # A shutdown now lets claims and notifications finish (see request_shutdown)
+            self.delivering = True
+            try:
+                if self.claimer.enabled:
+                    # First come, first served: claim before spending time on notifications
+                    with self._phase("auto_claim"):
+                        new_jobs = await self._auto_claim(new_jobs)
+
+                with self._phase("process_new_jobs"):
+                    try:
+                        # Notifications are real awaits, so wait_for can cancel a frozen call
+                        await asyncio.wait_for(self.process_new_jobs(new_jobs), NOTIFY_TIMEOUT or None)
+                    except asyncio.TimeoutError:
+                        self.logger.error(f"Notifications took longer than {NOTIFY_TIMEOUT}s, will retry them")
+            finally:
+                self.delivering = False
+            # Only the ones not sent yet, claim reports included, so nobody is notified twice
+            failed_jobs = [job for job in found_jobs if job["id"] in self.unnotified]
+            for job in failed_jobs:
+                self.seen_jobs.discard(job["id"])
+            self.unnotified = set()
+            if failed_jobs:
+                # Otherwise an unchanged grid would skip the retry
+                self.last_grid_fingerprint = None
+            return EXIT_NOTIFY_FAILED if failed_jobs else EXIT_OK
+
+    def _finish_cycle(self, cycle: int, status: str, started: float) -> str:
+        """Recycle an overrun browser, update the circuit breaker and write the heartbeat."""
+        overrun = self.watchdog.consume_overrun()
+        if overrun:
+            status = "overrun"
+            self.logger.warning(f"Recycling browser after '{overrun}' overran")
+            self._close_selenium()
+
+        # Notification failures say nothing about the portal's health
+        if status in ("ok", "notify_failed"):
+            self.portal_breaker.record_success()
+        else:
+            self.portal_breaker.record_failure()
+
+        self.heartbeat.beat(
+            cycle,
+            status,
+            time.monotonic() - started,
+            next_check_in=self._next_delay(status),
+            circuit=self.portal_breaker.snapshot(),
+            channels=self.notification_manager.channel_stats(),
+            filters=self.job_filter.stats()
+        )
+        return status
+
+    def _next_delay(self, status: str) -> float:
+        """Seconds to wait before the next cycle."""
+        if status in ("ok", "notify_failed"):
+            return self.check_interval
+        return self.portal_breaker.retry_after()
+
+    def apply_settings(self, settings: Dict, job_filter: Optional[JobFilter] = None):
+        """Apply reloaded settings (see live_config.py); job_filter replaces the current one if given."""
+        self.check_interval = settings["CHECK_INTERVAL"]
+        self.portal_breaker.failure_threshold = settings["FAILURE_THRESHOLD"]
+        self.portal_breaker.base_delay = settings["FAILURE_BACKOFF"]
+        self.portal_breaker.max_delay = settings["MAX_FAILURE_BACKOFF"]
+        self.priority_weights = configured_weights(settings["PRIORITY_WEIGHTS"])
+        if job_filter is not None:
+            self.job_filter = job_filter
+        self._set_log_level(settings["LOG_LEVEL"])
+
+    def _set_log_level(self, level: str):
+        """Apply a log level to every app logger (LSPScraper and LSPScraper.*) and the log file."""
+        for name, logger in list(logging.root.manager.loggerDict.items()):
+            if (name == 'LSPScraper' or name.startswith('LSPScraper.')) and isinstance(logger, logging.Logger):
+                logger.setLevel(level)
+        for handler in self.logger.handlers:
+            handler.setLevel(level)
+
+    async def _wait_for_next_cycle(self, status: str, delay: float):
+        """Sleep until the next cycle, applying config changes while waiting.
+
+        A reload that changes the check interval or backoff moves the wake-up
+        time accordingly.
+        """
+        waited_from = time.monotonic()
+        while True:
+            remaining = waited_from + delay - time.monotonic()
+            if remaining <= 0:
+                return
+            if not self.reloader:
+                await asyncio.sleep(remaining)
+                return
+            poll_interval = self.reloader.poll_interval
+            await self.reloader.wait(min(remaining, poll_interval) if poll_interval > 0 else remaining)
+            if await self.reloader.check():
+                delay = self._next_delay(status)
+
+    async def run(self, max_cycles: Optional[int] = None):
+        """Main execution loop.
+
+        Runs forever unless max_cycles is given (used by the profiling mode),
+        or until request_shutdown() stops it. Seen jobs are loaded from disk
+        first and saved after every cycle that changed them, so a restart
+        doesn't notify the open jobs again.
+        """
+        self._run_task = asyncio.current_task()
+        try:
+            await self._run_loop(max_cycles)
+        except asyncio.CancelledError:
+            if not self.stopping:
+                raise
+            # Cancelled by request_shutdown(); the caller still runs cleanup()
+            self._run_task.uncancel()
+            self.logger.info("Stopped the current cycle for shutdown")
+        finally:
+            self._run_task = None
+            if self._drain_timer:
+                self._drain_timer.cancel()
+
+    async def _run_loop(self, max_cycles: Optional[int]):
+        self.seen_jobs = load_seen_jobs()
+        self._saved_seen_jobs = set(self.seen_jobs)
 
-    async def run(self):
-        """Main execution loop."""
         # Verify notification systems on startup
         await self._verify_notification_systems()
         
         # Send startup notification
-        await self.notification_manager.send_telegram("LSP Job Notifier: Application has started and is now monitoring for new job postings.")
+        await self.notification_manager.notify(
+            "LSP Job Notifier", "Application has started and is now monitoring for new job postings."
+        )
+        
+        # Watch the config file, and reload on SIGHUP where there is one
+        self.reloader = ConfigReloader(self)
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.reloader.request)
+        except (AttributeError, NotImplementedError, RuntimeError):
+            pass
         
         # Track runs for periodic cleanup
         run_count = 0
         
-        while True:
+        while not self.stopping and (max_cycles is None or run_count < max_cycles):
+            # Increment run counter
+            run_count += 1
+            started = time.monotonic()
+            
             try:
-                # Increment run counter
-                run_count += 1
-                
-                # Periodic cleanup (every 10 runs)
-                if CLEANUP_OLD_FILES and run_count % 10 == 0:
+                # Periodic cleanup (first run, then every 10 runs) - kept out of
+                # __init__ so short-lived commands don't pay for the directory sweep
+                if CLEANUP_OLD_FILES and run_count % 10 == 1:
                     self._clean_old_files()
                 
-                # Login
-                if not await self.login():
-                    self.logger.error("Failed to login, retrying in 60 seconds...")
-                    await asyncio.sleep(60)
-                    continue
+                status = CYCLE_STATUS[await self._run_cycle()]
+            except Exception as e:
+                self.logger.error(f"Error in main loop: {str(e)}")
+                status = "error"
 
-                # Check for new jobs using the direct DOM navigation approach
-                self.logger.info("Checking for new jobs...")
-                new_jobs = await self.check_jobs_direct()
-                
-                if new_jobs:
-                    self.logger.info(f"Found {len(new_jobs)} new jobs")
-                    await self.process_new_jobs(new_jobs)
-                else:
-                    self.logger.info("No new jobs found")
+            status = self._finish_cycle(run_count, status, started)
+            if self.seen_jobs != self._saved_seen_jobs:
+                self._save_state()
 
-                # Wait before next check
-                await asyncio.sleep(30)  # 30 seconds instead of 300 (5 minutes)
+            if self.profiler:
+                self.profiler.end_cycle(self.driver)
 
-            except Exception as e:
-                self.logger.error(f"Error in main loop: {str(e)}")
-                await asyncio.sleep(60)  # Wait a minute before retrying
+            # Wait before next check, backing off while the portal keeps failing
+            if not self.stopping and (max_cycles is None or run_count < max_cycles):
+                delay = self._next_delay(status)
+                if status not in ("ok", "notify_failed"):
+                    self.logger.error(f"Cycle failed ({status}), retrying in {delay:.0f} seconds...")
+                await self._wait_for_next_cycle(status, delay)
+
+    async def run_once(self) -> int:
+        """Run a single check for cron/systemd timers and return an exit code.
+
+        Seen jobs are loaded from and saved to disk around the check, and no
+        startup/shutdown notifications are sent. Jobs whose notification failed
+        are left unseen so the next run retries them.
+        """
+        self.seen_jobs = load_seen_jobs()
+        started = time.monotonic()
+        status = "error"
+        try:
+            exit_code = await self._run_cycle()
+            status = CYCLE_STATUS[exit_code]
+            return exit_code
+        finally:
+            self._finish_cycle(1, status, started)
+            self._save_state()
+            await self._release_resources()
+
+    def handle_signal(self, signum, frame):
+        """SIGINT/SIGTERM handler starting a graceful shutdown.
+
+        Installed with signal.signal() rather than loop.add_signal_handler():
+        Selenium calls block the event loop, and only a plain handler runs
+        while one is in progress. Killing the browser makes that call fail
+        straight away instead of after its page load timeout.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            raise KeyboardInterrupt
+        if self.in_browser and not self.stopping and self._kill_browser():
+            self.logger.info("Killed the browser to interrupt the current check")
+        loop.call_soon_threadsafe(self.request_shutdown, signal.Signals(signum).name)
+
+    def request_shutdown(self, reason: str = "shutdown"):
+        """Stop run(), letting notifications already under way finish first.
+
+        A cycle that is claiming or notifying gets SHUTDOWN_TIMEOUT seconds to
+        finish, so nothing it has started to send goes out twice after a
+        restart. Anything else is cancelled at once, as is everything on a
+        second request. Jobs left unnotified are saved as unseen and notified
+        on the next start (see _save_state()).
+        """
+        if self._shutdown_deadline is None:
+            self._shutdown_deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        if self.stopping or not self.delivering or SHUTDOWN_TIMEOUT <= 0:
+            self.logger.info(f"Shutting down ({reason})")
+            self.stopping = True
+            self._cancel_run()
+            return
+        self.stopping = True
+        self.logger.info(f"Shutting down ({reason}) once notifications finish, at most {SHUTDOWN_TIMEOUT}s")
+        self._drain_timer = asyncio.get_running_loop().call_later(SHUTDOWN_TIMEOUT, self._cancel_run)
+
+    def _cancel_run(self):
+        if self._run_task is not None and not self._run_task.done():
+            self._run_task.cancel()
+
+    def _shutdown_time_left(self) -> float:
+        if self._shutdown_deadline is None:
+            return SHUTDOWN_TIMEOUT
+        return max(self._shutdown_deadline - time.monotonic(), 0)
+
+    def _save_state(self):
+        """Persist the seen jobs, leaving out those whose notification never went out."""
+        self.seen_jobs -= self.unnotified
+        self.unnotified = set()
+        try:
+            # Jobs still in the grid are kept however old; long-gone ones are pruned
+            self.seen_jobs -= save_seen_jobs(self.seen_jobs, present=(job["id"] for job in self.last_jobs))
+            self._saved_seen_jobs = set(self.seen_jobs)
+        except Exception as e:
+            self.logger.error(f"Failed to save seen jobs: {str(e)}")
+
+    async def _release_resources(self):
+        """Close the channels, sessions, job history and browser."""
+        try:
+            # An SMTP QUIT to an unreachable server must not hold up the exit
+            await asyncio.wait_for(self.notification_manager.close(), max(self._shutdown_time_left(), 1))
+        except asyncio.TimeoutError:
+            self.logger.warning("Gave up closing notification channels")
+        except Exception as e:
+            self.logger.warning(f"Error closing notification channels: {str(e)}")
+        await self._close_session()
+        self._close_selenium()
+        if self.history:
+            self.history.close()
 
     async def cleanup(self):
-        """Clean up resources."""
+        """Save state, send the shutdown notification and release every resource.
+
+        Only the first call does anything, so it is safe from both a signal
+        path and a finally block. The notification gets whatever is left of
+        SHUTDOWN_TIMEOUT.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        # Local and fast, so done before anything that waits on the network
+        self._save_state()
+        time_left = self._shutdown_time_left()
         try:
-            # Send shutdown notification
-            await self.notification_manager.send_telegram("LSP Job Notifier: Application has closed.")
+            if time_left <= 0:
+                raise asyncio.TimeoutError
+            await asyncio.wait_for(
+                self.notification_manager.notify("LSP Job Notifier", "Application has closed."), time_left
+            )
             self.logger.info("Sent application shutdown notification")
+        except asyncio.TimeoutError:
+            self.logger.warning("Skipped the shutdown notification, out of time")
         except Exception as e:
             self.logger.error(f"Error sending shutdown notification: {str(e)}")
         
-        await self._close_session()
-        self._close_selenium()
+        await self._release_resources()
         self.logger.info("Application resources cleaned up")
 
     async def _verify_notification_systems(self):
-        """Verify Telegram notification system on startup"""
-        self.logger.info("Verifying Telegram notification system...")
-        return await self.notification_manager.verify_telegram_bot()
+        """Verify the configured notification channels on startup"""
+        self.logger.info("Verifying notification channels...")
+        return await self.notification_manager.verify_channels()
     
     async def check_jobs_direct(self) -> List[Dict]:
         """Check for open jobs by directly navigating the DOM structure."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        self.last_check_failed = False
+        check_started = time.monotonic()
         try:
             self._init_selenium()
             
@@ -560,15 +1003,17 @@ class LSPScraper:
             self.logger.info("Waiting for interpreter portal to load...")
             time.sleep(5)
             
-            # Save screenshot for debugging
-            screenshot_path = os.path.join("data", "portal_screen.png")
-            self.driver.save_screenshot(screenshot_path)
-            self.logger.info(f"Saved portal screenshot to {screenshot_path}")
-
-            # Save page source for debugging
-            with open(os.path.join("data", "portal_direct.html"), "w", encoding="utf-8") as f:
-                f.write(self.driver.page_source)
-            self.logger.info("Saved portal page source")
+            # Save screenshot and page source for debugging; an unchanged grid
+            # (most polls) must not pay for them, see SAVE_DEBUG_FILES
+            if SAVE_DEBUG_FILES:
+                screenshot_path = os.path.join("data", "portal_screen.png")
+                self.driver.save_screenshot(screenshot_path)
+                self.logger.info(f"Saved portal screenshot to {screenshot_path}")
+                self._save_page_source("portal_direct.html")
+                self.logger.info("Saved portal page source")
+            
+            # The dashboard with my scheduled work is showing right now
+            self._refresh_schedule()
             
             # First, find the Open Jobs tab
             self.logger.info("Looking for 'Open Jobs' tab...")
@@ -592,7 +1037,8 @@ class LSPScraper:
                         self.logger.info(f"Found 'Open Jobs' tab with selector: {selector}")
                         
                         # Take screenshot before click
-                        self.driver.save_screenshot(os.path.join("data", "before_tab_click.png"))
+                        if SAVE_DEBUG_FILES:
+                            self.driver.save_screenshot(os.path.join("data", "before_tab_click.png"))
                         
                         # Try to click the tab
                         self.logger.info(f"Clicking tab element: {open_jobs_tab.text}")
@@ -602,7 +1048,8 @@ class LSPScraper:
                         
                         # Take screenshot after click
                         time.sleep(2)
-                        self.driver.save_screenshot(os.path.join("data", "after_tab_click.png"))
+                        if SAVE_DEBUG_FILES:
+                            self.driver.save_screenshot(os.path.join("data", "after_tab_click.png"))
                         break
                     except Exception as tab_ex:
                         self.logger.warning(f"Error with selector {selector}: {str(tab_ex)}")
@@ -616,88 +1063,56 @@ class LSPScraper:
             # Wait after tab click
             time.sleep(3)
             
-            # Save page source after clicking tab
-            with open(os.path.join("data", "after_tab_click.html"), "w", encoding="utf-8") as f:
-                f.write(self.driver.page_source)
-            
             # Try multiple approaches to find jobs
             
             # Approach 1: Find any grid component
             self.logger.info("Approach 1: Looking for any grid component...")
             try:
                 # Look for ag-grid components
-                grid_elements = self.driver.find_elements(By.CSS_SELECTOR, 
-                                                     "ag-grid-angular, .ag-root, [role='grid'], table.grid")
+                grid_elements = self.driver.find_elements(By.CSS_SELECTOR, GRID_SELECTOR)
                 
                 if grid_elements:
                     self.logger.info(f"Found {len(grid_elements)} grid elements")
+                    
+                    # Most polls see an unchanged list: hash the raw grid content in
+                    # one round-trip and skip extraction, diffing and debug dumps
+                    grid_fingerprint = self._grid_fingerprint()
+                    if grid_fingerprint and grid_fingerprint == self.last_grid_fingerprint:
+                        self.logger.info("Job grid unchanged since last cycle, skipping extraction")
+                        self._record_history(None)
+                        if self.recorder:
+                            self.recorder.capture(self.driver, list(self.seen_jobs), self.last_jobs, [])
+                        return []
+                    
+                    # Save page source after clicking tab
+                    self._save_page_source("after_tab_click.html")
                     # Take screenshot of the grid
                     self.driver.save_screenshot(os.path.join("data", "grid_screen.png"))
                     
-                    new_jobs = []
-                    # For each grid, try to extract rows
-                    for idx, grid in enumerate(grid_elements):
-                        try:
-                            # Try to find rows with various selectors
-                            rows = grid.find_elements(By.CSS_SELECTOR, 
-                                                  "div[role='row'], .ag-row, tr")
-                            
-                            self.logger.info(f"Grid {idx} has {len(rows)} rows")
-                            
-                            # Process each row to extract job information
-                            for row in rows:
-                                try:
-                                    # Skip header rows
-                                    if "header" in row.get_attribute("class").lower():
-                                        continue
-                                        
-                                    # Get row text for logging
-                                    row_text = row.text.strip()
-                                    
-                                    # Only process if row has content
-                                    if not row_text:
-                                        continue
-                                        
-                                    self.logger.info(f"Processing row: {row_text}")
-                                    
-                                    # Extract job ID
-                                    job_id = row.get_attribute("row-id") or f"job-{idx}-{rows.index(row)}"
-                                    
-                                    # Find cells
-                                    cells = row.find_elements(By.CSS_SELECTOR, 
-                                                          "div[role='gridcell'], .ag-cell, td")
-                                    
-                                    # If no job details but row has text, create a simple job entry
-                                    if len(cells) < 2 and row_text:
-                                        # Create job with the row text
-                                        job_details = {
-                                            "id": job_id,
-                                            "client_name": row_text,
-                                            "appointment_time": "",
-                                            "duration": "",
-                                            "location": "",
-                                            "description": row_text
-                                        }
-                                        new_jobs.append(job_details)
-                                        self.logger.info(f"Added simplified job: {job_details}")
-                                        continue
-                                    
-                                    # Normal job extraction with cells
-                                    job_details = self._extract_job_details_from_cells(job_id, cells)
-                                    
-                                    # Check if job is already seen
-                                    if job_details["id"] not in self.seen_jobs:
-                                        new_jobs.append(job_details)
-                                        self.seen_jobs.add(job_details["id"])
-                                except Exception as row_ex:
-                                    self.logger.warning(f"Error processing row: {str(row_ex)}")
-                        except Exception as grid_ex:
-                            self.logger.warning(f"Error processing grid {idx}: {str(grid_ex)}")
+                    seen_before = list(self.seen_jobs) if self.recorder else None
+                    jobs = self.extractor.extract_jobs(grid_elements)
+                    new_jobs = self.extractor.diff_jobs(jobs, self.seen_jobs)
+                    self.last_detection_time = time.monotonic()
+                    self.last_jobs = jobs
+                    if self._open_jobs_visible():
+                        self.last_grid_fingerprint = grid_fingerprint
+                        self._record_history(jobs, len(new_jobs), time.monotonic() - check_started)
+                    else:
+                        # Without the Open Jobs grid the rows aren't the open postings
+                        self.logger.warning("Open Jobs grid not visible, not archiving this poll's jobs")
+                        self.last_grid_fingerprint = None
+                        self._record_history(jobs, len(new_jobs), time.monotonic() - check_started, skipped=True)
+                    
+                    if self.recorder:
+                        self.recorder.capture(self.driver, seen_before, jobs, new_jobs)
                     
                     return new_jobs
             except Exception as e:
                 self.logger.warning(f"Error in approach 1: {str(e)}")
             
+            # No grid found - keep the page for debugging
+            self._save_page_source("after_tab_click.html")
+            
             # Approach 2: Look for any tables or list elements that might contain jobs
             self.logger.info("Approach 2: Looking for any tables or job lists...")
             try:
@@ -710,70 +1125,61 @@ class LSPScraper:
             except Exception as e:
                 self.logger.warning(f"Error in approach 2: {str(e)}")
             
+            # Keep the empty cycle too - these are the ones worth replaying
+            if self.recorder:
+                self.recorder.capture(self.driver, list(self.seen_jobs), [], [])
+            
             # If we couldn't find jobs with either approach, return empty list
             return []
             
         except Exception as e:
             self.logger.error(f"Error checking for jobs: {str(e)}")
             self.logger.error(f"Traceback: {traceback.format_exc()}")
+            self.last_check_failed = True
             return []
     
-    def _extract_job_details_from_cells(self, job_id, cells):
-        """Extract job details from cells in a grid row"""
-        # Default values
-        job_details = {
-            "id": job_id,
-            "client_name": "",
-            "appointment_time": "",
-            "duration": "",
-            "location": "",
-            "description": ""
-        }
-        
-        # Check for col-id attribute in cells
-        for idx, cell in enumerate(cells):
-            try:
-                col_id = cell.get_attribute("col-id")
-                cell_text = cell.text.strip()
-                
-                self.logger.info(f"Cell {idx} col-id: {col_id}, text: {cell_text}")
-                
-                # Map cell to job details based on col-id or position
-                if col_id:
-                    if col_id == "requestID":
-                        job_details["id"] = cell_text or job_id
-                    elif col_id == "customerName" or col_id == "customer":
-                        job_details["client_name"] = cell_text
-                    elif col_id == "interpretationTime" or col_id == "scheduledTime":
-                        job_details["appointment_time"] = cell_text
-                    elif col_id == "estimateDuration" or col_id == "duration":
-                        job_details["duration"] = cell_text
-                    elif col_id == "address" or col_id == "location":
-                        job_details["location"] = cell_text
-                else:
-                    # If no col-id, use position-based mapping
-                    if idx == 0:
-                        job_details["id"] = cell_text or job_id
-                    elif idx == 1:
-                        job_details["client_name"] = cell_text
-                    elif idx == 2:
-                        job_details["appointment_time"] = cell_text
-                    elif idx == 3:
-                        job_details["duration"] = cell_text
-                    elif idx == 4:
-                        job_details["location"] = cell_text
-            except Exception as e:
-                self.logger.warning(f"Error processing cell {idx}: {str(e)}")
-        
-        # Create description from available details
-        job_details["description"] = (
-            f"Client: {job_details['client_name']}\n"
-            f"Time: {job_details['appointment_time']}\n"
-            f"Duration: {job_details['duration']}\n"
-            f"Location: {job_details['location']}"
-        )
-        
-        return job_details
+    def _grid_fingerprint(self) -> Optional[str]:
+        """Hash the IDs and text of every grid row, or None if that fails."""
+        try:
+            content = self.driver.execute_script(GRID_CONTENT_SCRIPT, GRID_SELECTOR, ROW_SELECTOR)
+            return fingerprint(content or "")
+        except Exception as e:
+            self.logger.warning(f"Could not fingerprint job grid: {str(e)}")
+            return None
+
+    def _open_jobs_visible(self) -> bool:
+        """Whether the Open Jobs grid is showing, i.e. the extracted rows are the open postings."""
+        try:
+            return bool(self.driver.execute_script(
+                OPEN_JOBS_VISIBLE_SCRIPT, GRID_SELECTOR, list(OPEN_JOBS_MARKER_COLUMNS)
+            ))
+        except Exception as e:
+            self.logger.warning(f"Could not check for the Open Jobs grid: {str(e)}")
+            return False
+
+    def _record_history(self, jobs: Optional[List[Dict]], new_count: int = 0, check_seconds: float = None,
+                        skipped: bool = False):
+        """Add this poll to the job archive; None means the grid did not change.
+
+        A skipped poll (Open Jobs grid not visible) is logged without touching any job.
+        """
+        if not self.history:
+            return
+        try:
+            if skipped:
+                self.history.skip(check_seconds=check_seconds)
+            elif jobs is None:
+                self.history.touch()
+            else:
+                self.history.observe(jobs, new_count=new_count, check_seconds=check_seconds)
+        except Exception as e:
+            # The archive is for analysis only and must never fail a check
+            self.logger.warning(f"Could not update job history: {str(e)}")
+
+    def _save_page_source(self, filename: str):
+        """Save the current page source under data/ for debugging."""
+        with open(os.path.join("data", filename), "w", encoding="utf-8") as f:
+            f.write(self.driver.page_source)
 
     def _clean_old_files(self):
         """Clean up old data and screenshot files to prevent disk space issues."""
@@ -810,27 +1216,14 @@ class LSPScraper:
 
 
 if __name__ == "__main__":
-    import signal
-    import sys
-    
-    scraper = LSPScraper()
-    loop = asyncio.get_event_loop()
-    
-    # Set up signal handlers for graceful shutdown
-    def shutdown_handler(sig, frame):
-        print("Shutting down...")
-        loop.run_until_complete(scraper.cleanup())
-        loop.stop()
-        sys.exit(0)
-    
-    # Register shutdown handlers
-    signal.signal(signal.SIGINT, shutdown_handler)  # Ctrl+C
-    signal.signal(signal.SIGTERM, shutdown_handler)  # Termination signal
-    
-    try:
-        loop.run_until_complete(scraper.run())
-    except KeyboardInterrupt:
-        pass
-    finally:
-        loop.run_until_complete(scraper.cleanup())
-        loop.close() 
\ No newline at end of file
+    async def main():
+        scraper = LSPScraper()
+        # Graceful shutdown on Ctrl+C and on termination
+        signal.signal(signal.SIGINT, scraper.handle_signal)
+        signal.signal(signal.SIGTERM, scraper.handle_signal)
+        try:
+            await scraper.run()
+        finally:
+            await scraper.cleanup()
+
+    asyncio.run(main()) 
\ No newline at end of file
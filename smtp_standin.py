@@ -0,0 +1,96 @@
+"""Local stand-in SMTP server for trying out the email notification channel.
+
+Usage:
+    python smtp_standin.py [--port 8025] [--latency-ms 0] [--fail-rate 0.2]
+
+Run it, then start the notifier with NOTIFY_CHANNELS=telegram,email,
+EMAIL_SMTP_SERVER=127.0.0.1, EMAIL_SMTP_PORT=8025 and EMAIL_STARTTLS=false.
+Every received message is printed. A fraction of them can be rejected so the
+channel's circuit breaker can be exercised too. Only the SMTP commands
+smtplib uses for plain delivery are understood (no TLS or AUTH).
+"""
+import argparse
+import asyncio
+import json
+import random
+from datetime import datetime
+
+
+def make_handler(latency_ms: float, fail_rate: float):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply("220 smtp-standin ready")
+        sender, recipients = None, []
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                command = raw.decode(errors="replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    await reply("250-smtp-standin")
+                    await reply("250 8BITMIME")
+                elif verb == "HELO":
+                    await reply("250 smtp-standin")
+                elif verb == "MAIL":
+                    sender, recipients = command[10:].strip(), []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(command[8:].strip())
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        line = (await reader.readline()).decode(errors="replace")
+                        if line in (".\r\n", ".\n", ""):
+                            break
+                        lines.append(line[1:] if line.startswith("..") else line)
+                    await asyncio.sleep(latency_ms / 1000)
+                    if random.random() < fail_rate:
+                        await reply("451 Simulated failure")
+                        continue
+                    print(f"{datetime.now().isoformat()} from={sender} to={recipients}")
+                    print("".join(lines).rstrip())
+                    print("-" * 60)
+                    await reply("250 OK queued")
+                elif verb in ("RSET", "NOOP"):
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(host: str, port: int, latency_ms: float, fail_rate: float):
+    server = await asyncio.start_server(make_handler(latency_ms, fail_rate), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in SMTP server for the email channel")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated delay before accepting a message")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of messages rejected")
+    args = parser.parse_args()
+
+    print(json.dumps(vars(args)), flush=True)
+    try:
+        asyncio.run(serve(args.host, args.port, args.latency_ms, args.fail_rate))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from config import STATE_FILE, SEEN_JOBS_RETENTION_DAYS
+
+logger = logging.getLogger('LSPScraper.state')
+
+
+def load_seen_jobs(path: str = STATE_FILE) -> Set[str]:
+    """Load the set of already-notified job IDs, or an empty set if there is none yet."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return set(json.load(f).get("seen_jobs", []))
+    except FileNotFoundError:
+        return set()
+    except Exception as e:
+        logger.error(f"Failed to load seen jobs from {path}, starting empty: {str(e)}")
+        return set()
+
+
+def _load_last_seen(path: str) -> Dict[str, float]:
+    # Files written before pruning have no last_seen; their jobs count as seen now
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("last_seen", {})
+    except Exception:
+        return {}
+
+
+def save_seen_jobs(seen_jobs: Set[str], path: str = STATE_FILE, present: Iterable[str] = (),
+                   retention_days: float = SEEN_JOBS_RETENTION_DAYS, now: Optional[float] = None) -> Set[str]:
+    """Persist the seen job IDs atomically so a crash never leaves a torn file.
+
+    Each ID is stored with the last time it was in the grid (present) or, for
+    a new one, first saved. IDs absent for more than retention_days are left
+    out, so the file stops growing once old postings are gone. Returns the
+    pruned IDs.
+    """
+    now = now if now is not None else time.time()
+    previous = _load_last_seen(path)
+    present = {str(job_id) for job_id in present}
+    last_seen = {}
+    for job_id in (str(job_id) for job_id in seen_jobs):
+        last_seen[job_id] = now if job_id in present else previous.get(job_id, now)
+    pruned = set()
+    if retention_days > 0:
+        cutoff = now - retention_days * 86400
+        pruned = {job_id for job_id, seen_at in last_seen.items() if seen_at < cutoff}
+        for job_id in pruned:
+            del last_seen[job_id]
+        if pruned:
+            logger.info(f"Forgetting {len(pruned)} seen jobs not in the grid for {retention_days:g} days")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"seen_jobs": sorted(last_seen), "last_seen": last_seen}, f)
+    os.replace(tmp_path, path)
+    return pruned
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columns import iso_timestamp, parse_datetime
+from appointments import ScheduleIndex
+
+
+class ConflictTimezoneTest(unittest.TestCase):
+    """Dashboard times have no zone, open-job times say "EDT"; the host's zone must not matter."""
+
+    def setUp(self):
+        self._saved_tz = os.environ.get("TZ")
+
+    def tearDown(self):
+        if self._saved_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self._saved_tz
+        time.tzset()
+        iso_timestamp.cache_clear()
+
+    def conflicts_on_host(self, host_tz):
+        os.environ["TZ"] = host_tz
+        time.tzset()
+        iso_timestamp.cache_clear()
+        assigned = {"id": "#1", "appointment_at": parse_datetime("05/16/2025 09:30 AM"), "duration_minutes": 60}
+        job = {"id": "#2", "appointment_at": parse_datetime("05/16/2025 09:30 AM EDT"), "duration_minutes": 60}
+        return ScheduleIndex([assigned]).conflicts(job)
+
+    def test_same_wall_clock_time_conflicts_on_any_host(self):
+        for host_tz in ("UTC", "America/New_York", "Asia/Tokyo"):
+            with self.subTest(host_tz=host_tz):
+                self.assertEqual(self.conflicts_on_host(host_tz), ["#1"])
+
+    def test_hours_apart_do_not_conflict(self):
+        os.environ["TZ"] = "UTC"
+        time.tzset()
+        iso_timestamp.cache_clear()
+        assigned = {"id": "#1", "appointment_at": parse_datetime("05/16/2025 09:30 AM"), "duration_minutes": 60}
+        job = {"id": "#2", "appointment_at": parse_datetime("05/16/2025 01:30 PM EDT"), "duration_minutes": 60}
+        self.assertEqual(ScheduleIndex([assigned]).conflicts(job), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
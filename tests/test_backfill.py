@@ -0,0 +1,69 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+from backfill import CYCLE_START, ROW_PREFIX, backfill
+from columns import ColumnSchema
+from extraction import GRID_SELECTOR, JobExtractor
+from history import JobHistory
+from replay import HtmlElement
+
+
+def first_logged_poll(path):
+    """The lines of the first poll in the log that logged any rows."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        lines = f.readlines()
+    first_row = next(i for i, line in enumerate(lines) if ROW_PREFIX in line)
+    start = max(i for i in range(first_row) if lines[i].rstrip().endswith(CYCLE_START))
+    end = next(i for i in range(first_row, len(lines))
+               if "No new jobs found" in lines[i] or " new jobs" in lines[i].split(" - ", 3)[-1])
+    return lines[start:end + 1]
+
+
+class BackfillThenLiveTest(unittest.TestCase):
+    """A job archived from the logs must not look changed when the live scraper first sees it."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = os.path.join(self.tmp, "history.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_live_poll_after_backfill_writes_no_changes(self):
+        log_slice = os.path.join(self.tmp, "scraper.log")
+        with open(log_slice, "w", encoding="utf-8") as f:
+            f.writelines(first_logged_poll(os.path.join(ROOT, "logs", "scraper.log")))
+
+        history = JobHistory(self.db)
+        stats = backfill([log_slice], history, ColumnSchema())
+        observed_at = history.last_observed()
+        history.close()
+        self.assertEqual(stats["observed"], 1)
+
+        with open(os.path.join(ROOT, "data", "after_tab_click.html"), "r", encoding="utf-8") as f:
+            grids = HtmlElement(BeautifulSoup(f.read(), "html.parser")).find_elements(None, GRID_SELECTOR)
+        live_jobs = JobExtractor().extract_jobs(grids)
+        self.assertIn("18138", {job["id"] for job in live_jobs})
+
+        history = JobHistory(self.db)
+        try:
+            history.observe(live_jobs, observed_at=observed_at + 60)
+            for job_id in ("18138", "18139"):
+                with self.subTest(job_id=job_id):
+                    job = history.job(job_id)
+                    self.assertEqual(job["versions"], 1)
+                    self.assertEqual(job["changes"], [])
+        finally:
+            history.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from channels import Channel, build_channels
+from notifications import NotificationManager
+
+SUBJECT = "New Job Available: Smith & Sons <ASL>"
+MESSAGE = "<b>Client:</b> Smith &amp; Sons &lt;ASL&gt;\n\n<b>Job ID:</b> 18138"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class SmtpStandin:
+    """smtp_standin.py in a subprocess, for as long as the with block runs."""
+
+    def __init__(self, fail_rate: float = 0.0):
+        self.port = free_port()
+        self.fail_rate = fail_rate
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "smtp_standin.py"),
+             "--port", str(self.port), "--fail-rate", str(self.fail_rate)],
+            stdout=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return self
+            except OSError:
+                if time.monotonic() > deadline:
+                    self.__exit__()
+                    raise
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(10)
+
+
+class SlowChannel(Channel):
+    """A destination that never answers."""
+
+    async def _send(self, subject, message):
+        await asyncio.sleep(60)
+        return True
+
+
+class ChannelFanOutTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.notify_file = os.path.join(self.tmp, "notifications.jsonl")
+        self.manager = NotificationManager()
+
+    def tearDown(self):
+        asyncio.run(self.manager.close())
+        shutil.rmtree(self.tmp)
+
+    def settings(self, channels: str, port: int = 0, **overrides):
+        settings = {
+            "NOTIFY_CHANNELS": channels,
+            "CHANNEL_TIMEOUT": 5,
+            "CHANNEL_FAILURE_THRESHOLD": 2,
+            "CHANNEL_BACKOFF": 60,
+            "CHANNEL_MAX_BACKOFF": 600,
+            "EMAIL_SMTP_SERVER": "127.0.0.1",
+            "EMAIL_SMTP_PORT": port,
+            "EMAIL_USERNAME": None,
+            "EMAIL_PASSWORD": None,
+            "EMAIL_FROM": "notifier@example.com",
+            "EMAIL_TO": "me@example.com",
+            "EMAIL_STARTTLS": False,
+            "WEBHOOK_URLS": "",
+            "NOTIFY_FILE": self.notify_file,
+        }
+        settings.update(overrides)
+        self.manager.channels = build_channels(self.manager, settings)
+        return {channel.name: channel for channel in self.manager.channels}
+
+    def file_lines(self):
+        if not os.path.exists(self.notify_file):
+            return []
+        with open(self.notify_file, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_every_channel_gets_the_message(self):
+        with SmtpStandin() as smtp:
+            channels = self.settings("email,file", smtp.port)
+            self.assertTrue(asyncio.run(self.manager.notify(SUBJECT, MESSAGE)))
+        self.assertEqual(channels["email"].breaker.consecutive_failures, 0)
+        [line] = self.file_lines()
+        self.assertEqual(line["subject"], SUBJECT)
+        self.assertEqual(line["text"], "Client: Smith & Sons <ASL>\n\nJob ID: 18138")
+
+    def test_file_alone_does_not_count_as_delivered(self):
+        with SmtpStandin(fail_rate=1.0) as smtp:
+            self.settings("email,file", smtp.port)
+            self.assertFalse(asyncio.run(self.manager.notify(SUBJECT, MESSAGE)))
+        self.assertEqual(len(self.file_lines()), 1)
+
+    def test_retry_skips_channels_that_accepted(self):
+        with SmtpStandin(fail_rate=1.0) as smtp:
+            self.settings("email,file", smtp.port)
+            pending = self.manager.channel_names()
+
+            async def send_twice():
+                first = await self.manager.notify(SUBJECT, MESSAGE, pending)
+                second = await self.manager.notify(SUBJECT, MESSAGE, pending)
+                return first, second
+
+            self.assertEqual(asyncio.run(send_twice()), (False, False))
+        self.assertEqual(pending, {"email"})
+        self.assertEqual(len(self.file_lines()), 1)
+
+    def test_breaker_opens_and_skips_dead_channel(self):
+        # Nothing listens on this port
+        channels = self.settings("email,file", free_port())
+        email = channels["email"]
+        attempts = []
+        deliver = email._deliver
+        email._deliver = lambda message: attempts.append(message) or deliver(message)
+
+        async def send_three():
+            return [await self.manager.notify(SUBJECT, MESSAGE) for _ in range(3)]
+
+        self.assertEqual(asyncio.run(send_three()), [False, False, False])
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(email.breaker.snapshot()["state"], "open")
+        self.assertEqual(self.manager.channel_stats()["file"]["state"], "closed")
+        self.assertEqual(len(self.file_lines()), 3)
+
+    def test_slow_channel_only_costs_its_own_timeout(self):
+        self.settings("file")
+        slow = SlowChannel("slow", {
+            "CHANNEL_TIMEOUT": 0.5, "CHANNEL_FAILURE_THRESHOLD": 3, "CHANNEL_BACKOFF": 60, "CHANNEL_MAX_BACKOFF": 600,
+        })
+        self.manager.channels.append(slow)
+
+        started = time.monotonic()
+        self.assertFalse(asyncio.run(self.manager.notify(SUBJECT, MESSAGE)))
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(slow.breaker.consecutive_failures, 1)
+        self.assertEqual(len(self.file_lines()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from claim import AutoClaimer
+from filters import JobFilter
+
+
+class _Response:
+    status = 200
+
+    async def text(self):
+        return '{"status": "accepted"}'
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Session:
+    """Records each request instead of sending it."""
+
+    def __init__(self):
+        self.requests = []
+
+    def post(self, url, data=None, **kwargs):
+        self.requests.append((url, data))
+        return _Response()
+
+
+def claimer(payload):
+    rules = JobFilter.from_dict({"include": [{"field": "language", "op": "eq", "value": "Spanish"}]})
+    claimer = AutoClaimer("dry-run", rules)
+    claimer.url = "http://127.0.0.1:8765/claim/{job_id}"
+    claimer.payload = payload
+    return claimer
+
+
+class ClaimRequestTest(unittest.TestCase):
+    def claim(self, job_id, payload='{"requestID": {job_id}}'):
+        session = _Session()
+        results = asyncio.run(claimer(payload).claim([{"id": job_id}], None, session, None))
+        self.assertTrue(results[0].success)
+        return session.requests[0]
+
+    def test_job_id_is_substituted_in_url_and_body(self):
+        url, body = self.claim("18138")
+        self.assertEqual(url, "http://127.0.0.1:8765/claim/18138")
+        self.assertEqual(json.loads(body), {"requestID": "18138"})
+
+    def test_body_stays_valid_json(self):
+        url, body = self.claim('18"138\\')
+        self.assertEqual(json.loads(body), {"requestID": '18"138\\'})
+        self.assertEqual(url, "http://127.0.0.1:8765/claim/18%22138%5C")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+from extraction import GRID_SELECTOR, JobExtractor, normalize_job_format
+from filters import JobFilter
+from replay import HtmlElement
+
+
+def open_jobs():
+    """The two open jobs of data/after_tab_click.html, normalized as the scraper does."""
+    with open(os.path.join(ROOT, "data", "after_tab_click.html"), "r", encoding="utf-8") as f:
+        grids = HtmlElement(BeautifulSoup(f.read(), "html.parser")).find_elements(None, GRID_SELECTOR)
+    extractor = JobExtractor()
+    jobs = extractor.diff_jobs(extractor.extract_jobs(grids), set())
+    return [normalize_job_format(job) for job in jobs]
+
+
+class FilterCompileTest(unittest.TestCase):
+    def test_invalid_rules_raise(self):
+        with self.assertRaises(ValueError):
+            JobFilter.from_dict({"include": [{"field": "language", "op": "like", "value": "Spanish"}]})
+        with self.assertRaises(KeyError):
+            JobFilter.from_dict({"include": [{"op": "eq", "value": "Spanish"}]})
+        with self.assertRaises(ValueError):
+            JobFilter.from_dict({"include_mode": "most"})
+
+    def test_invalid_file_passes_everything(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "job_filters.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"exclude": [{"field": "distance_miles", "op": "gt", "value": "far"}]}, f)
+            job_filter = JobFilter.from_file(path)
+        finally:
+            shutil.rmtree(tmp)
+        self.assertEqual(job_filter.rules, [])
+        self.assertEqual(len(job_filter.apply(open_jobs())), 2)
+
+    def test_operators_on_extracted_jobs(self):
+        jobs = {job["id"]: job for job in open_jobs()}
+        cases = [
+            ({"field": "distance_miles", "op": "le", "value": 25}, {"18139"}),
+            ({"field": "duration_minutes", "op": "between", "value": [150, 240]}, {"18139"}),
+            ({"field": "client_name", "op": "contains", "value": "refugee"}, {"18139"}),
+            ({"field": "location", "op": "matches", "value": r"lexington, ky"}, {"18138"}),
+            ({"field": "weekday", "op": "in", "value": ["Fri", "Sat"]}, {"18138"}),
+            ({"field": "columns.requestDesc", "op": "eq", "value": "spanish - other appearance"},
+             {"18138", "18139"}),
+        ]
+        for rule, expected in cases:
+            with self.subTest(rule=rule):
+                job_filter = JobFilter.from_dict({"include": [rule]})
+                self.assertEqual({job["id"] for job in job_filter.apply(list(jobs.values()))}, expected)
+
+
+class FilterHitCountTest(unittest.TestCase):
+    def test_every_rule_counts_its_hits(self):
+        job_filter = JobFilter.from_dict({
+            "include_mode": "any",
+            "include": [
+                {"name": "spanish", "field": "language", "op": "eq", "value": "Spanish"},
+                {"name": "nearby", "field": "distance_miles", "op": "lt", "value": 10},
+            ],
+            "exclude": [
+                {"name": "lexington", "field": "location", "op": "contains", "value": "Lexington"},
+                {"name": "long", "field": "duration_minutes", "op": "ge", "value": 180},
+            ],
+        })
+        kept = job_filter.apply(open_jobs())
+
+        self.assertEqual(kept, [])
+        # "any" is already decided by the first include rule, and the first
+        # exclude rule already drops 18138, yet the later rules still count
+        self.assertEqual(job_filter.stats(), {
+            "evaluated": 2,
+            "passed": 0,
+            "rule_hits": {"spanish": 2, "nearby": 1, "lexington": 1, "long": 1},
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
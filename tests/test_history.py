@@ -0,0 +1,142 @@
+import contextlib
+import copy
+import functools
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+from extraction import GRID_SELECTOR, JobExtractor
+from history import JobHistory, main
+from replay import HtmlElement
+
+T0 = 1_747_058_826.0  # 2025-05-12 14:07 UTC
+
+
+@functools.lru_cache(maxsize=1)
+def _extracted_jobs():
+    with open(os.path.join(ROOT, "data", "after_tab_click.html"), "r", encoding="utf-8") as f:
+        grids = HtmlElement(BeautifulSoup(f.read(), "html.parser")).find_elements(None, GRID_SELECTOR)
+    return JobExtractor().extract_jobs(grids)
+
+
+def open_jobs():
+    """Rows of data/after_tab_click.html as the live scraper hands them to the archive."""
+    return copy.deepcopy(_extracted_jobs())
+
+
+class HistoryArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = os.path.join(self.tmp, "history.sqlite3")
+        self.history = JobHistory(self.db)
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.tmp)
+
+    def cycles(self):
+        return self.history.conn.execute(
+            "SELECT observed_at, job_count, skipped FROM cycles ORDER BY observed_at"
+        ).fetchall()
+
+    def test_job_lifecycle(self):
+        jobs = open_jobs()
+        self.history.observe(jobs, observed_at=T0, new_count=2)
+        self.history.observe(open_jobs(), observed_at=T0 + 60, new_count=0)
+        self.history.touch(T0 + 120)
+
+        job = self.history.job("18138")
+        self.assertEqual((job["first_seen"], job["last_seen"], job["versions"]), (T0, T0 + 120, 1))
+        self.assertEqual(job["changes"], [])
+        self.assertEqual(job["fields"]["client_name"], "KRM Lex RSS OSS")
+
+        changed = open_jobs()
+        for row in changed:
+            if row["id"] == "18138":
+                row["duration"], row["duration_minutes"] = "90", 90
+        self.history.observe(changed, observed_at=T0 + 180)
+        job = self.history.job("18138")
+        self.assertEqual(job["versions"], 2)
+        self.assertEqual(job["changes"][0]["changes"], {"duration": ["120", "90"], "duration_minutes": [120, 90]})
+
+        # Taken, then reposted
+        self.history.observe([row for row in changed if row["id"] != "18138"], observed_at=T0 + 240)
+        self.assertEqual(self.history.job("18138")["removed_at"], T0 + 240)
+        self.history.observe(changed, observed_at=T0 + 300)
+        job = self.history.job("18138")
+        self.assertIsNone(job["removed_at"])
+        self.assertEqual(job["first_seen"], T0)
+        self.assertEqual(job["changes"][-1]["changes"], {"reposted": True})
+
+    def test_skipped_poll_changes_no_job(self):
+        self.history.observe(open_jobs(), observed_at=T0)
+        self.history.skip(observed_at=T0 + 60, check_seconds=1.5)
+
+        job = self.history.job("18139")
+        self.assertEqual((job["last_seen"], job["removed_at"]), (T0, None))
+        self.assertEqual(self.cycles(), [(T0, 2, 0), (T0 + 60, 0, 1)])
+        self.assertEqual(self.history.last_observed(), T0 + 60)
+
+
+class HistoryCliTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = os.path.join(self.tmp, "history.sqlite3")
+        history = JobHistory(self.db)
+        jobs = open_jobs()
+        history.observe(jobs, observed_at=T0)
+        # 18139 is taken after 30 minutes
+        history.observe([job for job in jobs if job["id"] == "18138"], observed_at=T0 + 1800)
+        history.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def run_cli(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = main(["--db", self.db, *args])
+        return code, out.getvalue().splitlines()
+
+    def test_customers(self):
+        code, lines = self.run_cli("customers")
+        self.assertEqual(code, 0)
+        rows = {line[:40].strip(): line[40:].split() for line in lines[1:]}
+        self.assertEqual(rows["Kentucky Refugee Ministries"], ["1", "30.0"])
+        # Still open, so no time listed yet
+        self.assertEqual(rows["KRM Lex RSS OSS"], ["1", "-"])
+
+    def test_fill_time(self):
+        code, lines = self.run_cli("fill-time")
+        self.assertEqual(code, 0)
+        self.assertIn("over 1 jobs", lines[0])
+        self.assertIn("median 30.0", lines[1])
+
+    def test_postings(self):
+        code, lines = self.run_cli("postings")
+        self.assertEqual(code, 0)
+        self.assertEqual(sum(int(line.split()[-1]) for line in lines[2:]), 2)
+
+    def test_job(self):
+        code, lines = self.run_cli("job", "18139")
+        self.assertEqual(code, 0)
+        self.assertIn("1 versions", lines[0])
+        self.assertEqual(self.run_cli("job", "99999"), (1, ["Job 99999 is not in the archive"]))
+
+    def test_missing_archive(self):
+        self.db = os.path.join(self.tmp, "missing.sqlite3")
+        code, _ = self.run_cli("customers")
+        self.assertEqual(code, 1)
+        self.assertFalse(os.path.exists(self.db))
+
+
+if __name__ == "__main__":
+    unittest.main()
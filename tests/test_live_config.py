@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadlines import CircuitBreaker
+from live_config import ConfigReloader
+from notifications import NotificationManager
+from scraper import LSPScraper
+
+
+class FakeScraper:
+    """Just what ConfigReloader touches: the notification manager and apply_settings()."""
+
+    def __init__(self):
+        self.notification_manager = NotificationManager()
+        self.applied = []
+
+    def apply_settings(self, settings, job_filter=None):
+        self.applied.append((settings, job_filter))
+
+
+class ConfigReloadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, ".env")
+        self.write("")
+        self.scraper = FakeScraper()
+        self.reloader = ConfigReloader(self.scraper, self.path, poll_interval=0)
+
+    def tearDown(self):
+        asyncio.run(self.scraper.notification_manager.close())
+        shutil.rmtree(self.tmp)
+
+    def write(self, text, name=".env"):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def reload(self, text):
+        self.write(text)
+        return asyncio.run(self.reloader.reload())
+
+    def test_valid_settings_are_applied(self):
+        self.assertTrue(self.reload("CHECK_INTERVAL=120\nPRIORITY_WEIGHTS=urgency=1\nLOG_LEVEL=debug\n"))
+        settings, job_filter = self.scraper.applied[-1]
+        self.assertEqual(settings["CHECK_INTERVAL"], 120)
+        self.assertEqual(settings["PRIORITY_WEIGHTS"], "urgency=1")
+        self.assertEqual(settings["LOG_LEVEL"], "DEBUG")
+        self.assertIsNone(job_filter)
+        self.assertEqual(self.reloader.settings, settings)
+
+    def test_removed_setting_goes_back_to_startup_value(self):
+        self.assertTrue(self.reload("CHECK_INTERVAL=120\n"))
+        self.assertTrue(self.reload(""))
+        self.assertEqual(self.scraper.applied[-1][0]["CHECK_INTERVAL"], self.reloader.defaults["CHECK_INTERVAL"])
+
+    def test_one_invalid_value_rejects_the_whole_reload(self):
+        before = dict(self.reloader.settings)
+        invalid = [
+            "CHECK_INTERVAL=60\nCHANNEL_TIMEOUT=-1\n",
+            "CHECK_INTERVAL=60\nPRIORITY_WEIGHTS=speed=1\n",
+            "CHECK_INTERVAL=60\nEMAIL_SMTP_PORT=70000\n",
+            "CHECK_INTERVAL=60\nNOTIFY_CHANNELS=telegram,pager\n",
+            "CHECK_INTERVAL=60\nFAILURE_BACKOFF=600\nMAX_FAILURE_BACKOFF=60\n",
+            "CHECK_INTERVAL=60\nLOG_LEVEL=LOUD\n",
+        ]
+        for text in invalid:
+            with self.subTest(text=text):
+                with self.assertLogs("LSPScraper.config", "ERROR"):
+                    self.assertFalse(self.reload(text))
+                self.assertEqual(self.scraper.applied, [])
+                self.assertEqual(self.reloader.settings, before)
+
+    def test_invalid_job_filters_reject_the_reload(self):
+        filters = self.write('{"include": [{"field": "language", "op": "like"}]}', "job_filters.json")
+        with self.assertLogs("LSPScraper.config", "ERROR"):
+            self.assertFalse(self.reload(f"CHECK_INTERVAL=60\nJOB_FILTERS_FILE={filters}\n"))
+        self.assertEqual(self.scraper.applied, [])
+
+        self.write('{"include": [{"field": "language", "op": "eq", "value": "Spanish"}]}', "job_filters.json")
+        self.assertTrue(asyncio.run(self.reloader.reload()))
+        settings, job_filter = self.scraper.applied[-1]
+        self.assertEqual(settings["JOB_FILTERS_FILE"], filters)
+        self.assertEqual([rule.name for rule in job_filter.include], ["include-0"])
+
+    def test_channels_are_rebuilt_only_when_their_settings_change(self):
+        manager = self.scraper.notification_manager
+        notify_file = os.path.join(self.tmp, "notifications.jsonl")
+        self.assertTrue(self.reload(f"NOTIFY_CHANNELS=file\nNOTIFY_FILE={notify_file}\n"))
+        [channel] = manager.channels
+        self.assertEqual((channel.name, channel.path), ("file", notify_file))
+
+        self.assertTrue(self.reload(f"NOTIFY_CHANNELS=file\nNOTIFY_FILE={notify_file}\nCHECK_INTERVAL=90\n"))
+        self.assertIs(manager.channels[0], channel)
+
+    def test_process_environment_wins_over_the_file(self):
+        with mock.patch("live_config.PROCESS_ENV_KEYS", frozenset({"CHECK_INTERVAL"})):
+            self.assertTrue(self.reload("CHECK_INTERVAL=120\nFAILURE_THRESHOLD=7\n"))
+        settings, _ = self.scraper.applied[-1]
+        self.assertEqual(settings["CHECK_INTERVAL"], self.reloader.defaults["CHECK_INTERVAL"])
+        self.assertEqual(settings["FAILURE_THRESHOLD"], 7)
+
+    def test_check_reloads_only_on_change_or_request(self):
+        self.assertFalse(asyncio.run(self.reloader.check()))
+        self.reloader.request()
+        self.assertTrue(asyncio.run(self.reloader.check()))
+        self.assertFalse(asyncio.run(self.reloader.check()))
+
+
+class ApplyLogLevelTest(unittest.TestCase):
+    def setUp(self):
+        self.loggers = [logging.getLogger(name) for name in (
+            "LSPScraper", "LSPScraper.notifications", "LSPScraper.channels.email", "LSPScraper.history",
+        )]
+        self.levels = {
+            logger: logger.level for name, logger in list(logging.root.manager.loggerDict.items())
+            if name.startswith("LSPScraper") and isinstance(logger, logging.Logger)
+        }
+
+    def tearDown(self):
+        for logger, level in self.levels.items():
+            logger.setLevel(level)
+
+    def test_reloaded_level_reaches_every_app_logger(self):
+        scraper = LSPScraper.__new__(LSPScraper)
+        scraper.logger = logging.getLogger("LSPScraper")
+        scraper.portal_breaker = CircuitBreaker("portal")
+        # An explicit level on a module logger must not keep it out of the reload
+        logging.getLogger("LSPScraper.history").setLevel("INFO")
+
+        reloader = ConfigReloader(FakeScraper(), os.devnull, poll_interval=0)
+        settings = reloader.parse({"LOG_LEVEL": "ERROR"})
+        scraper.apply_settings(settings)
+
+        for logger in self.loggers:
+            with self.subTest(logger=logger.name):
+                self.assertEqual(logger.getEffectiveLevel(), logging.ERROR)
+        self.assertEqual(logging.getLogger("unrelated").level, logging.NOTSET)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+from html.parser import HTMLParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from channels import plain_text
+from claim import ClaimResult
+from messages import claim_message, job_message
+
+
+class _Text(HTMLParser):
+    """Collect text and tags the way Telegram's HTML parse mode would see them."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tags = []
+        self.text = ""
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.append(tag)
+
+    def handle_data(self, data):
+        self.text += data
+
+
+def parse(message):
+    parser = _Text()
+    parser.feed(message)
+    parser.close()
+    return parser
+
+
+JOB = {
+    "id": "18138",
+    "client_name": "Smith & Sons <ASL>",
+    "appointment_time": "05/16/2025 09:30 AM EDT",
+    "duration": "1 hr",
+    "location": "1 Main St <rear>, Louisville, KY, 40204",
+    "request_description": "Smith & Sons <ASL>",
+}
+
+
+class JobMessageTest(unittest.TestCase):
+    def test_values_are_escaped(self):
+        subject, message = job_message(JOB)
+        parsed = parse(message)
+        self.assertEqual(set(parsed.tags), {"b"})
+        self.assertIn("Request: Smith & Sons <ASL>", parsed.text)
+        self.assertIn("Location: 1 Main St <rear>, Louisville, KY, 40204", parsed.text)
+        self.assertEqual(subject, "New Job Available: Smith & Sons <ASL>")
+
+    def test_plain_text_channels_get_the_original_value(self):
+        _, message = job_message(JOB)
+        self.assertIn("Request: Smith & Sons <ASL>", plain_text(message))
+
+
+class ClaimMessageTest(unittest.TestCase):
+    def test_values_are_escaped(self):
+        result = ClaimResult(JOB, False, 409, "taken <already>", 120.0, 450.0)
+        subject, message = claim_message(result, "dry-run")
+        parsed = parse(message)
+        self.assertEqual(set(parsed.tags), {"b"})
+        self.assertIn("Client: Smith & Sons <ASL>", parsed.text)
+        self.assertIn("Result: 409 taken <already>", parsed.text)
+        self.assertEqual(subject, "Claim FAILED (dry run): Smith & Sons <ASL>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columns import iso_timestamp
+from priority import NotificationQueue, parse_weights
+
+
+def starting_in(hours, now):
+    return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(now + hours * 3600))
+
+
+class NotificationOrderTest(unittest.TestCase):
+    def setUp(self):
+        iso_timestamp.cache_clear()
+
+    def test_soon_and_close_pops_before_far_and_next_month(self):
+        now = time.time()
+        far = {"id": "far", "appointment_at": starting_in(30 * 24, now), "nearest_base_miles": 120.0,
+               "duration_minutes": 120}
+        soon = {"id": "soon", "appointment_at": starting_in(3, now), "nearest_base_miles": 4.0,
+                "duration_minutes": 120}
+        queue = NotificationQueue(parse_weights("urgency=0.6,distance=0.3,duration=0.1"))
+        # Grid order puts the far job first
+        queue.push([far, soon], now)
+        self.assertEqual([queue.pop()["id"], queue.pop()["id"]], ["soon", "far"])
+
+    def test_empty_weights_keep_grid_order(self):
+        now = time.time()
+        far = {"id": "far", "appointment_at": starting_in(30 * 24, now), "nearest_base_miles": 120.0}
+        soon = {"id": "soon", "appointment_at": starting_in(3, now), "nearest_base_miles": 4.0}
+        queue = NotificationQueue(parse_weights(""))
+        queue.push([far, soon], now)
+        self.assertEqual([queue.pop()["id"], queue.pop()["id"]], ["far", "soon"])
+
+
+if __name__ == "__main__":
+    unittest.main()
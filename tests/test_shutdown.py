@@ -0,0 +1,191 @@
+import asyncio
+import functools
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+import scraper
+import state
+from deadlines import Heartbeat
+from extraction import GRID_SELECTOR
+from filters import JobFilter
+from live_config import ConfigReloader
+from replay import HtmlElement
+
+JOB_SUBJECTS = {"New Job Available: KRM Lex RSS OSS", "New Job Available: Kentucky Refugee Ministries"}
+CLOSED = "Application has closed."
+
+
+class ShutdownTest(unittest.TestCase):
+    """A shutdown mid-cycle must neither lose nor repeat a job notification.
+
+    The browser is replaced by the open jobs of data/after_tab_click.html and
+    the channels by a recording notify(); everything else is the real scraper.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.tmp, "seen_jobs.json")
+        self.logger = logging.getLogger("LSPScraper")
+        self.handlers = list(self.logger.handlers)
+        patches = mock.patch.multiple(
+            scraper,
+            LOG_FILE=os.path.join(self.tmp, "scraper.log"),
+            JOB_HISTORY=False,
+            HOME_BASES="",
+            CLEANUP_OLD_FILES=False,
+            load_seen_jobs=functools.partial(state.load_seen_jobs, self.state_file),
+            save_seen_jobs=functools.partial(state.save_seen_jobs, path=self.state_file),
+            ConfigReloader=functools.partial(ConfigReloader, path=os.path.join(self.tmp, ".env"), poll_interval=0),
+        )
+        patches.start()
+        self.addCleanup(patches.stop)
+        with open(os.path.join(ROOT, "data", "after_tab_click.html"), "r", encoding="utf-8") as f:
+            self.soup = BeautifulSoup(f.read(), "html.parser")
+        # Every notification that went out, across restarts
+        self.sent = []
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            if handler not in self.handlers:
+                self.logger.removeHandler(handler)
+                handler.close()
+        shutil.rmtree(self.tmp)
+
+    def make_scraper(self, on_job=None, on_check=None):
+        """A scraper whose check returns the page's unseen jobs and whose notify() records them.
+
+        on_job(scraper, n) runs as the n-th job notification starts and returns
+        how long that notification takes; on_check runs inside the check.
+        """
+        sc = scraper.LSPScraper(record_cycles=False)
+        sc.job_filter = JobFilter()
+        sc.heartbeat = Heartbeat(os.path.join(self.tmp, "heartbeat.json"))
+        sc.check_interval = 0
+        started = []
+
+        async def verify():
+            return True
+
+        async def login():
+            return True
+
+        async def check():
+            if on_check:
+                await on_check(sc)
+            grids = HtmlElement(self.soup).find_elements(None, GRID_SELECTOR)
+            return sc.extractor.diff_jobs(sc.extractor.extract_jobs(grids), sc.seen_jobs)
+
+        async def notify(subject, message, pending=None):
+            delay = 0
+            if subject in JOB_SUBJECTS:
+                started.append(subject)
+                delay = on_job(sc, len(started)) if on_job else 0
+            await asyncio.sleep(delay)
+            self.sent.append(subject if subject in JOB_SUBJECTS else message)
+            return True
+
+        sc._verify_notification_systems = verify
+        sc.login = login
+        sc.check_jobs_direct = check
+        sc.notification_manager.notify = notify
+        return sc
+
+    def run_until_stopped(self, sc, max_cycles=None):
+        async def main():
+            try:
+                await sc.run(max_cycles)
+            finally:
+                await sc.cleanup()
+                # Safe to call twice, e.g. from a signal path and a finally block
+                await sc.cleanup()
+
+        started = time.monotonic()
+        asyncio.run(main())
+        return time.monotonic() - started
+
+    def job_notifications(self):
+        return [subject for subject in self.sent if subject in JOB_SUBJECTS]
+
+    def restart_and_finish(self):
+        """Start again with the saved state and run one cycle with a working notify()."""
+        self.run_until_stopped(self.make_scraper(), max_cycles=1)
+        # Every job notified exactly once over both runs
+        self.assertEqual(sorted(self.job_notifications()), sorted(JOB_SUBJECTS))
+
+    def test_signal_while_notifying_lets_notifications_finish(self):
+        def on_job(sc, n):
+            if n == 1:
+                os.kill(os.getpid(), signal.SIGTERM)
+            return 0.2
+
+        sc = self.make_scraper(on_job)
+        previous = signal.signal(signal.SIGTERM, sc.handle_signal)
+        try:
+            with mock.patch.object(scraper, "SHUTDOWN_TIMEOUT", 5):
+                elapsed = self.run_until_stopped(sc)
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+
+        self.assertLess(elapsed, 4)
+        self.assertEqual(sorted(self.job_notifications()), sorted(JOB_SUBJECTS))
+        self.assertEqual(self.sent.count(CLOSED), 1)
+        self.assertEqual(state.load_seen_jobs(self.state_file), {"18138", "18139"})
+        self.restart_and_finish()
+
+    def test_frozen_notification_is_cut_off_and_retried_after_restart(self):
+        def on_job(sc, n):
+            if n == 1:
+                sc.request_shutdown("SIGTERM")
+                return 0
+            return 30
+
+        with mock.patch.object(scraper, "SHUTDOWN_TIMEOUT", 0.5):
+            elapsed = self.run_until_stopped(self.make_scraper(on_job))
+
+        self.assertLess(elapsed, 3)
+        self.assertEqual(len(self.job_notifications()), 1)
+        self.assertEqual(self.sent.count(CLOSED), 0)  # No time left for it
+        self.assertEqual(len(state.load_seen_jobs(self.state_file)), 1)
+        self.restart_and_finish()
+
+    def test_second_request_stops_at_once(self):
+        def on_job(sc, n):
+            sc.request_shutdown("SIGINT")
+            return 0 if n == 1 else 30
+
+        with mock.patch.object(scraper, "SHUTDOWN_TIMEOUT", 10):
+            elapsed = self.run_until_stopped(self.make_scraper(on_job))
+
+        self.assertLess(elapsed, 3)
+        self.assertEqual(len(self.job_notifications()), 1)
+        self.assertEqual(self.sent.count(CLOSED), 1)
+        self.restart_and_finish()
+
+    def test_shutdown_during_check_is_immediate(self):
+        async def on_check(sc):
+            sc.request_shutdown("SIGTERM")
+            await asyncio.sleep(30)
+
+        with mock.patch.object(scraper, "SHUTDOWN_TIMEOUT", 10):
+            elapsed = self.run_until_stopped(self.make_scraper(on_check=on_check))
+
+        self.assertLess(elapsed, 3)
+        self.assertEqual(self.job_notifications(), [])
+        self.assertEqual(state.load_seen_jobs(self.state_file), set())
+        self.restart_and_finish()
+
+
+if __name__ == "__main__":
+    unittest.main()
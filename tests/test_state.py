@@ -0,0 +1,47 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state import load_seen_jobs, save_seen_jobs
+
+DAY = 86400
+
+
+class SeenJobsPruningTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "seen_jobs.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_jobs_gone_longer_than_retention_are_pruned(self):
+        start = 1_700_000_000.0
+        save_seen_jobs({"1", "2", "3"}, self.path, present={"1", "2", "3"}, retention_days=30, now=start)
+        # 2 is still in the grid a week later, 1 and 3 are gone
+        save_seen_jobs({"1", "2", "3"}, self.path, present={"2"}, retention_days=30, now=start + 7 * DAY)
+
+        pruned = save_seen_jobs({"1", "2", "3", "4"}, self.path, present=(), retention_days=30,
+                                now=start + 31 * DAY)
+        self.assertEqual(pruned, {"1", "3"})
+        self.assertEqual(load_seen_jobs(self.path), {"2", "4"})
+
+    def test_zero_retention_keeps_everything(self):
+        save_seen_jobs({"1"}, self.path, retention_days=0, now=0)
+        self.assertEqual(save_seen_jobs({"1"}, self.path, retention_days=0, now=365 * DAY), set())
+        self.assertEqual(load_seen_jobs(self.path), {"1"})
+
+    def test_file_without_timestamps_counts_as_seen_now(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"seen_jobs": ["1", "2"]}, f)
+        self.assertEqual(save_seen_jobs(load_seen_jobs(self.path), self.path, retention_days=30), set())
+        self.assertEqual(load_seen_jobs(self.path), {"1", "2"})
+
+
+if __name__ == "__main__":
+    unittest.main()